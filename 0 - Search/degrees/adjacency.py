@@ -0,0 +1,101 @@
+import sys
+import threading
+from collections import OrderedDict
+
+# Rough bytes per cached set, and per (movie, person) pair in a set: the
+# tuple plus its share of the set's hash table (ids themselves are shared)
+SET_BYTES = sys.getsizeof(frozenset())
+PAIR_BYTES = sys.getsizeof(("", "")) + 32
+
+
+class CostarCache():
+    """
+    Co-star adjacency layer in front of a neighbors function.
+
+    Either every person's neighbors are precomputed up front, or they are
+    filled in lazily and kept in an LRU bounded to `maxsize` people
+    (unbounded if `maxsize` is None).
+    """
+
+    def __init__(self, load, maxsize=None):
+        """`load` maps a person key to its set of (movie, person) neighbors."""
+        self.load = load
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # (movie, person) pairs held across all entries
+        self.pairs = 0
+        # Guards the LRU order, since the query server answers from threads
+        self.lock = threading.Lock()
+
+    def precompute(self, keys):
+        """Loads the neighbors of every key in `keys`, ignoring `maxsize`."""
+        for key in keys:
+            neighbors = frozenset(self.load(key))
+            with self.lock:
+                self.store(key, neighbors)
+        self.maxsize = None
+
+    def get(self, key):
+        """Returns the (frozen) neighbors of `key`, loading them on a miss."""
+        with self.lock:
+            neighbors = self.entries.get(key)
+            if neighbors is not None:
+                self.hits += 1
+                if self.maxsize is not None:
+                    self.entries.move_to_end(key)
+                return neighbors
+            self.misses += 1
+
+        neighbors = frozenset(self.load(key))
+        with self.lock:
+            self.store(key, neighbors)
+            if self.maxsize is not None and len(self.entries) > self.maxsize:
+                _, evicted = self.entries.popitem(last=False)
+                self.pairs -= len(evicted)
+                self.evictions += 1
+        return neighbors
+
+    def store(self, key, neighbors):
+        """Caches the neighbors of `key`; the caller holds the lock."""
+        previous = self.entries.get(key)
+        if previous is not None:
+            self.pairs -= len(previous)
+        self.entries[key] = neighbors
+        self.pairs += len(neighbors)
+
+    def invalidate(self, keys=None):
+        """Drops the cached neighbors of `keys`, or of everyone if None."""
+        with self.lock:
+            if keys is None:
+                self.entries.clear()
+                self.pairs = 0
+                return
+            for key in keys:
+                neighbors = self.entries.pop(key, None)
+                if neighbors is not None:
+                    self.pairs -= len(neighbors)
+
+    def stats(self):
+        """
+        Returns counters and memory use: entries held, (movie, person)
+        pairs held, and an estimate of the bytes used by the cached sets
+        (from the entry and pair counts, so it costs nothing to compute).
+        """
+        with self.lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+            entries, pairs = len(self.entries), self.pairs
+            nbytes = sys.getsizeof(self.entries)
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": evictions,
+            "entries": entries,
+            "maxsize": self.maxsize,
+            "pairs": pairs,
+            "bytes": nbytes + entries * SET_BYTES + pairs * PAIR_BYTES,
+        }
@@ -0,0 +1,185 @@
+"""
+Benchmark suite for degrees search.
+
+For each dataset size, generates a synthetic dataset and times
+load_data (plain, compact, and snapshot cold/warm), neighbors_for_person,
+candidates_for_name (exact, prefix and misspelled names), and
+shortest_path and bidirectional_shortest_path grouped by path length.
+Results are written as JSON, and can be compared against an earlier run.
+
+Usage:
+    python benchmark.py [--sizes N ...] [--queries N] [--output FILE]
+                        [--compare FILE] [--workdir DIR]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import degrees
+from synthetic import generate
+
+# Movies generated per person
+MOVIES_PER_PERSON = 0.2
+
+# Most timed queries per path length, per search
+PER_LENGTH = 20
+
+
+def timed(function, *args, **kwargs):
+    """Returns (result, seconds) of calling function."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def summary(samples):
+    """Returns count, mean, median and max of a list of timings."""
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "mean": sum(samples) / len(samples),
+        "median": samples[len(samples) // 2],
+        "max": samples[-1],
+    }
+
+
+def time_loads(directory):
+    """Times each way of loading `directory`, leaving it loaded compactly."""
+    results = {}
+    _, results["plain"] = timed(degrees.load_data, directory)
+    _, results["compact"] = timed(degrees.load_data, directory, compact=True)
+    snapshot = f"{directory}/degrees.snapshot"
+    if os.path.exists(snapshot):
+        os.remove(snapshot)
+    _, results["snapshot_cold"] = timed(degrees.load_data, directory, snapshot=snapshot)
+    _, results["snapshot_warm"] = timed(degrees.load_data, directory, snapshot=snapshot)
+    degrees.load_data(directory, compact=True)
+    return results
+
+
+def time_neighbors(person_ids):
+    """Times neighbors_for_person over `person_ids`."""
+    return summary([
+        timed(degrees.neighbors_for_person, person_id)[1]
+        for person_id in person_ids
+    ])
+
+
+def time_names(person_ids, rng):
+    """
+    Times candidates_for_name on the full names of `person_ids`, on their
+    first five characters, and with one character deleted.
+    """
+    names = [degrees.people[person_id]["name"] for person_id in person_ids]
+    misspelled = []
+    for name in names:
+        i = rng.randrange(len(name))
+        misspelled.append(name[:i] + name[i + 1:])
+    return {
+        label: summary([timed(degrees.candidates_for_name, query)[1] for query in queries])
+        for label, queries in (
+            ("exact", names),
+            ("prefix", [name[:5] for name in names]),
+            ("misspelled", misspelled),
+        )
+    }
+
+
+def time_searches(pairs):
+    """
+    Times both searches over `pairs`, grouped by the length of the shortest
+    path between them ("none" for unconnected pairs).
+    """
+    by_length = defaultdict(list)
+    for source, target in pairs:
+        path = degrees.bidirectional_shortest_path(source, target)
+        length = "none" if path is None else str(len(path))
+        if len(by_length[length]) < PER_LENGTH:
+            by_length[length].append((source, target))
+
+    results = {}
+    for length, group in sorted(by_length.items()):
+        results[length] = {
+            "shortest_path": summary([
+                timed(degrees.shortest_path, source, target)[1]
+                for source, target in group
+            ]),
+            "bidirectional_shortest_path": summary([
+                timed(degrees.bidirectional_shortest_path, source, target)[1]
+                for source, target in group
+            ]),
+        }
+    return results
+
+
+def run(sizes, queries, workdir, seed=0):
+    """Runs the suite for each people count in `sizes`; returns the results."""
+    rng = random.Random(seed)
+    results = {"sizes": {}}
+    for size in sizes:
+        directory = os.path.join(workdir, f"synthetic-{size}")
+        generate(directory, people=size,
+                 movies=max(1, int(size * MOVIES_PER_PERSON)), seed=seed)
+        loads = time_loads(directory)
+        person_ids = list(degrees.people)
+        pairs = [
+            (rng.choice(person_ids), rng.choice(person_ids))
+            for _ in range(queries)
+        ]
+        results["sizes"][str(size)] = {
+            "load_data": loads,
+            "neighbors_for_person": time_neighbors(
+                rng.sample(person_ids, min(queries, len(person_ids)))
+            ),
+            "candidates_for_name": time_names(
+                rng.sample(person_ids, min(queries, len(person_ids))), rng
+            ),
+            "search": time_searches(pairs),
+        }
+        print(f"Benchmarked {size} people.", file=sys.stderr)
+    return results
+
+
+def compare(old, new, prefix=""):
+    """Prints the new / old ratio for every timing present in both results."""
+    for key, value in new.items():
+        if key not in old:
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            compare(old[key], value, f"{name}.")
+        elif key != "count" and isinstance(value, float) and old[key]:
+            print(f"{name}: {old[key]:.6f}s -> {value:.6f}s ({value / old[key]:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees search.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--workdir", help="where to generate datasets")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.workdir:
+        results = run(args.sizes, args.queries, args.workdir, args.seed)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run(args.sizes, args.queries, workdir, args.seed)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 import csv
 import sys
+from itertools import islice
 
+from adjacency import CostarCache
+from ingest import ingest
+from namesearch import NameSearch
+from snapshot import (NameIndex, append_journal, load_snapshot,
+                      write_snapshot)
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,15 +18,63 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Prefix and fuzzy index over people's names, rebuilt by load_data
+name_search = None
 
-def load_data(directory):
+# Compact CSR graph of star credits, set when loading with compact=True
+graph = None
+
+# Optional CostarCache of neighbors, keyed by person index when `graph` is set
+adjacency = None
+
+
+def load_data(directory, compact=False, snapshot=None):
     """
     Load data from CSV files into memory.
+
+    With `compact`, star credits are kept only in a CompactGraph of
+    dense int IDs, `people`/`movies` are RecordTables of index-aligned
+    columns over the graph's ID-to-index dicts, and `names` is a
+    NameIndex over the name search keys.
+
+    With a `snapshot` path (which implies `compact`), data is memory-mapped
+    from that snapshot if it is up to date with the CSVs; otherwise the
+    CSVs are loaded and the snapshot is rewritten, if it can be.
     """
+    global people, movies, names, name_search, graph, adjacency
+    adjacency = None
+
+    if snapshot is not None:
+        loaded = load_snapshot(snapshot, directory)
+        if loaded is not None:
+            people, movies, names, name_search, graph, journal = loaded
+            for entry in journal:
+                apply_rows(entry["people"], entry["movies"], entry["stars"])
+            return
+        load_data(directory, compact=True)
+        try:
+            write_snapshot(snapshot, directory, graph, people, movies, name_search)
+        except OSError as e:
+            # The snapshot is only a cache, so carry on with the loaded data
+            print(f"Could not write snapshot: {e}", file=sys.stderr)
+        return
+
+    if compact:
+        graph, people, movies, _ = ingest(directory)
+        name_search = NameSearch.build(graph.person_ids, people.columns["name"])
+        names = NameIndex(name_search.keys, name_search.people, graph.person_ids)
+        return
+
+    people, movies, names = {}, {}, {}
+    graph = None
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
+            # Rows re-added by add_data replace the person's earlier name
+            if row["id"] in people:
+                forget_name(row["id"])
             people[row["id"]] = {
                 "name": row["name"],
                 "birth": row["birth"],
@@ -30,6 +84,7 @@ def load_data(directory):
                 names[row["name"].lower()] = {row["id"]}
             else:
                 names[row["name"].lower()].add(row["id"])
+    name_search = index_names()
 
     # Load movies
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
@@ -52,6 +107,16 @@ def load_data(directory):
                 pass
 
 
+def index_names():
+    """
+    Builds the NameSearch index over the names of the loaded people.
+    """
+    person_ids = list(people)
+    return NameSearch.build(
+        person_ids, [people[person_id]["name"] for person_id in person_ids]
+    )
+
+
 def main():
     if len(sys.argv) > 2:
         sys.exit("Usage: python degrees.py [directory]")
@@ -59,7 +124,7 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, snapshot=f"{directory}/degrees.snapshot")
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +134,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = bidirectional_shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -84,12 +149,25 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 #%%
-def shortest_path(source, target):
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
-    If no possible path, returns None.
+    If no possible path, returns None. If a SearchStats `stats` is given,
+    it is filled in, and BudgetExceeded is raised if its budget runs out.
+    """
+    try:
+        return breadth_first_search(source, target, stats)
+    finally:
+        if stats is not None:
+            stats.finish()
+
+
+def breadth_first_search(source, target, stats):
+    """
+    Breadth-first search behind shortest_path, recording each
+    expansion in `stats` if given.
     """
     start = Node(state=source, parent=None, action=None)
     frontier = QueueFrontier()
@@ -101,6 +179,8 @@ def shortest_path(source, target):
             return None
         node = frontier.remove()
         explored.add(node.state)
+        if stats is not None:
+            stats.expand(len(frontier.frontier) + 1, len(explored))
         for movie, person in neighbors_for_person(node.state):
             if person == target:
                 child = Node(state=person, parent=node, action=movie)
@@ -117,7 +197,191 @@ def shortest_path(source, target):
             elif not frontier.contains_state(person) and person not in explored: # if not at target, expand frontier
                 child = Node(state=person, parent=node, action=movie)
                 frontier.add(child)
-                
+
+
+def bidirectional_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both ends at once and stopping where the two searches meet.
+
+    If no possible path, returns None. If a SearchStats `stats` is given,
+    it is filled in, and BudgetExceeded is raised if its budget runs out.
+    """
+    try:
+        if graph is not None:
+            path = bidirectional_search(
+                graph.person_index[source], graph.person_index[target],
+                index_neighbors, stats
+            )
+            if path is None:
+                return None
+            return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+        return bidirectional_search(source, target, neighbors_for_person, stats)
+    finally:
+        if stats is not None:
+            stats.finish()
+
+
+def bidirectional_search(source, target, neighbors, stats=None):
+    """
+    Bidirectional BFS between two states of a graph given by `neighbors`,
+    a function returning the (action, state) pairs adjacent to a state.
+
+    Returns the list of (action, state) steps from source to target,
+    or None if they are not connected. Expansions are recorded in `stats`,
+    which raises BudgetExceeded when its budget runs out.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached person to the (movie_id, person_id) step that reached them
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+        # Always grow the smaller side, which keeps both frontiers small
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = expand_layer(
+                forward_layer, forward, backward, neighbors, stats
+            )
+        else:
+            backward_layer, meeting = expand_layer(
+                backward_layer, backward, forward, neighbors, stats
+            )
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+    return None
+
+
+def expand_layer(layer, parents, other_parents, neighbors, stats=None):
+    """
+    Expands one full BFS layer, recording parents for newly reached people.
+
+    Returns the next layer, and the first person also reached by the
+    other search (or None if the searches have not met yet).
+    """
+    next_layer = []
+    for i, person_id in enumerate(layer):
+        if stats is not None:
+            stats.expand(len(layer) - i + len(next_layer),
+                         len(parents) + len(other_parents))
+        for movie_id, neighbor in neighbors(person_id):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (movie_id, person_id)
+            if neighbor in other_parents:
+                return next_layer, neighbor
+            next_layer.append(neighbor)
+    return next_layer, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Builds the (movie_id, person_id) path through the meeting person
+    from the parents recorded by both searches.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, previous = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, following = backward[person_id]
+        path.append((movie_id, following))
+        person_id = following
+    return path
+
+
+def all_shortest_paths(source, target, k=None, stats=None):
+    """
+    Lazily yields every shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, or only the first `k`.
+
+    Yields nothing if there is no possible path. Expansions are recorded
+    in `stats` if given, which raises BudgetExceeded when its budget runs
+    out.
+    """
+    if graph is not None:
+        paths = dag_paths(
+            graph.person_index[source], graph.person_index[target],
+            index_neighbors, stats
+        )
+        paths = (
+            [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+            for path in paths
+        )
+    else:
+        paths = dag_paths(source, target, neighbors_for_person, stats)
+    yield from islice(paths, k)
+
+
+def dag_paths(source, target, neighbors, stats=None):
+    """
+    Yields every shortest list of (action, state) steps from source to
+    target, walking back through the BFS parent DAG from the target.
+    """
+    parents = parent_dag(source, target, neighbors, stats)
+    if parents is None:
+        return
+
+    # Depth-first over the DAG, one parent iterator per step of the path
+    steps = []
+    stack = [iter(parents[target])]
+    states = [target]
+    while stack:
+        if states[-1] == source:
+            yield list(reversed(steps))
+            states.pop()
+            stack.pop()
+            if steps:
+                steps.pop()
+            continue
+        step = next(stack[-1], None)
+        if step is None:
+            states.pop()
+            stack.pop()
+            if steps:
+                steps.pop()
+            continue
+        action, parent = step
+        steps.append((action, states[-1]))
+        states.append(parent)
+        stack.append(iter(parents[parent]))
+
+
+def parent_dag(source, target, neighbors, stats=None):
+    """
+    Runs a layered BFS from source until the target's layer is complete.
+
+    Returns a dict mapping each state within that depth to the list of
+    (action, parent) pairs one layer closer to the source, or None if the
+    target cannot be reached. Expansions are recorded in `stats` if given.
+    """
+    parents = {source: []}
+    layer = [source]
+    while layer and target not in parents:
+        next_layer = {}
+        for i, state in enumerate(layer):
+            if stats is not None:
+                stats.expand(len(layer) - i + len(next_layer),
+                             len(parents) + len(next_layer))
+            for action, neighbor in neighbors(state):
+                if neighbor in parents:
+                    continue
+                next_layer.setdefault(neighbor, []).append((action, state))
+        parents.update(next_layer)
+        layer = list(next_layer)
+    if target not in parents:
+        return None
+    return parents
+
 #%%
 def person_id_for_name(name):
     """
@@ -145,11 +409,44 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def candidates_for_name(name, limit=10):
+    """
+    Returns up to `limit` person_ids whose names best match a partial or
+    misspelled name, best first.
+    """
+    return name_search.search(name, limit)
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {
+            (graph.movie_ids[m], graph.person_ids[q])
+            for m, q in index_neighbors(graph.person_index[person_id])
+        }
+    if adjacency is not None:
+        return adjacency.get(person_id)
+    return load_neighbors(person_id)
+
+
+def index_neighbors(p):
+    """
+    Returns (movie_index, person_index) pairs for people
+    who starred with person index `p` in the compact graph.
+    """
+    if adjacency is not None:
+        return adjacency.get(p)
+    return graph.neighbors(p)
+
+
+def load_neighbors(person_id):
+    """
+    Builds the (movie_id, person_id) neighbors of a person
+    from the `people` and `movies` dicts.
+    """
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -158,5 +455,133 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def use_adjacency_cache(maxsize=None, precompute=False):
+    """
+    Puts a co-star adjacency cache in front of neighbors_for_person for the
+    loaded data, and returns it so its stats() can be inspected.
+
+    With `precompute`, every person's neighbors are built now; otherwise
+    they are filled lazily into an LRU of at most `maxsize` people.
+    Loading data again drops the cache.
+    """
+    global adjacency
+    if graph is not None:
+        adjacency = CostarCache(graph.neighbors, maxsize)
+        keys = range(len(graph.person_ids))
+    else:
+        adjacency = CostarCache(load_neighbors, maxsize)
+        keys = people
+    if precompute:
+        adjacency.precompute(keys)
+    return adjacency
+
+
+def add_data(people_rows=(), movie_rows=(), star_rows=(),
+             directory=None, snapshot=None):
+    """
+    Adds people, movies and star credits to the loaded data without
+    reloading it. Rows are dicts keyed like the CSV columns.
+
+    With `directory`, the rows are also appended to its CSVs; with a
+    `snapshot` path as well, they are journaled next to that snapshot,
+    which then stays valid for the grown CSVs. A `snapshot` without a
+    `directory` raises ValueError, as the journal could not be stamped.
+    """
+    if snapshot is not None and directory is None:
+        raise ValueError("journaling to a snapshot needs its directory")
+    people_rows, movie_rows, star_rows = (
+        list(people_rows), list(movie_rows), list(star_rows)
+    )
+    apply_rows(people_rows, movie_rows, star_rows)
+    if directory is None:
+        return
+    append_csv(f"{directory}/people.csv", ("id", "name", "birth"), people_rows)
+    append_csv(f"{directory}/movies.csv", ("id", "title", "year"), movie_rows)
+    append_csv(f"{directory}/stars.csv", ("person_id", "movie_id"), star_rows)
+    if snapshot is not None:
+        append_journal(snapshot, directory, {
+            "people": people_rows, "movies": movie_rows, "stars": star_rows
+        })
+
+
+def apply_rows(people_rows, movie_rows, star_rows):
+    """
+    Adds rows to the loaded data (dicts or compact graph) and drops the
+    cached adjacency of everyone whose co-stars changed.
+    """
+    for row in people_rows:
+        person_id = row["id"]
+        if person_id in people:
+            forget_name(person_id)
+        record = {"name": row["name"], "birth": row["birth"]}
+        if graph is None:
+            record["movies"] = people[person_id]["movies"] if person_id in people else set()
+        else:
+            graph.add_person(person_id)
+        people[person_id] = record
+        if isinstance(names, dict):
+            names.setdefault(row["name"].lower(), set()).add(person_id)
+        else:
+            names.add(row["name"].lower(), person_id)
+        name_search.add(person_id, row["name"])
+
+    for row in movie_rows:
+        movie_id = row["id"]
+        record = {"title": row["title"], "year": row["year"]}
+        if graph is None:
+            record["stars"] = movies[movie_id]["stars"] if movie_id in movies else set()
+        else:
+            graph.add_movie(movie_id)
+        movies[movie_id] = record
+
+    affected = set()
+    for row in star_rows:
+        person_id, movie_id = row["person_id"], row["movie_id"]
+        if graph is None:
+            if person_id not in people or movie_id not in movies:
+                continue
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+            affected.update(movies[movie_id]["stars"])
+        else:
+            p = graph.person_index.get(person_id)
+            m = graph.movie_index.get(movie_id)
+            if p is None or m is None:
+                continue
+            if graph.add_star(p, m):
+                affected.update(graph.stars_of(m))
+    if adjacency is not None:
+        adjacency.invalidate(affected)
+
+
+def forget_name(person_id):
+    """Drops the name a loaded person is known by from `names`."""
+    name = people[person_id]["name"].lower()
+    if isinstance(names, dict):
+        person_ids = names.get(name, set())
+        person_ids.discard(person_id)
+        if not person_ids:
+            names.pop(name, None)
+    else:
+        names.discard(name, person_id)
+
+
+def append_csv(path, columns, rows):
+    """Appends rows (dicts keyed by `columns`) to the CSV at `path`."""
+    if not rows:
+        return
+    with open(path, "rb+") as f:
+        # Make sure the file ends with a newline before appending
+        f.seek(0, 2)
+        if f.tell():
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        for row in rows:
+            writer.writerow([row[column] for column in columns])
+
+
 if __name__ == "__main__":
     main()
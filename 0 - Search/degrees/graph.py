@@ -0,0 +1,234 @@
+from array import array
+from collections import ChainMap
+
+
+class CompactGraph():
+    """
+    Bipartite person <-> movie graph with IDs interned to dense ints.
+
+    Edges are stored in CSR form: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    stars of movie `m` are `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+    Offsets and indices are any int sequences (arrays or memoryviews).
+    ID-to-index mappings are built from the ID lists unless given.
+
+    People, movies and credits added after construction are kept in an
+    overlay next to the (read-only) CSR arrays.
+    """
+
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_index=None, movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        if person_index is None:
+            person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.csr_people = len(person_offsets) - 1
+        self.csr_movies = len(movie_offsets) - 1
+        self.extra_movies = {}
+        self.extra_stars = {}
+
+    @classmethod
+    def from_edges(cls, person_ids, movie_ids, edges):
+        """
+        Builds a graph from lists of person and movie IDs and an
+        iterable of (person_index, movie_index) star credits.
+        Duplicate credits are dropped.
+        """
+        sources = array("i")
+        targets = array("i")
+        for p, m in edges:
+            sources.append(p)
+            targets.append(m)
+        return cls.from_columns(person_ids, movie_ids, sources, targets)
+
+    @classmethod
+    def from_columns(cls, person_ids, movie_ids, sources, targets,
+                     person_index=None, movie_index=None):
+        """
+        Builds a graph from lists of person and movie IDs and parallel
+        int arrays of the person and movie index of each star credit.
+        Duplicate credits are dropped. ID-to-index mappings the caller
+        already has can be passed in rather than rebuilt.
+        """
+        person_offsets, person_movies = dedupe(
+            *csr(len(person_ids), sources, targets)
+        )
+        # Person index of each credit, in person_movies order
+        owners = array("i")
+        for p in range(len(person_ids)):
+            owners.extend(array("i", [p]) * (person_offsets[p + 1] - person_offsets[p]))
+        movie_offsets, movie_people = csr(len(movie_ids), person_movies, owners)
+        return cls(person_ids, movie_ids,
+                   person_offsets, person_movies, movie_offsets, movie_people,
+                   person_index, movie_index)
+
+    def movies_of(self, p):
+        """Returns the movie indexes person index `p` starred in."""
+        movies = ()
+        if p < self.csr_people:
+            movies = self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+        if p in self.extra_movies:
+            return list(movies) + self.extra_movies[p]
+        return movies
+
+    def stars_of(self, m):
+        """Returns the person indexes who starred in movie index `m`."""
+        stars = ()
+        if m < self.csr_movies:
+            stars = self.movie_people[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+        if m in self.extra_stars:
+            return list(stars) + self.extra_stars[m]
+        return stars
+
+    def add_person(self, person_id):
+        """Returns the index of person_id, adding the person if new."""
+        if person_id in self.person_index:
+            return self.person_index[person_id]
+        self.person_ids, self.person_index = appendable(
+            self.person_ids, self.person_index
+        )
+        self.person_index[person_id] = len(self.person_ids)
+        self.person_ids.append(person_id)
+        return self.person_index[person_id]
+
+    def add_movie(self, movie_id):
+        """Returns the index of movie_id, adding the movie if new."""
+        if movie_id in self.movie_index:
+            return self.movie_index[movie_id]
+        self.movie_ids, self.movie_index = appendable(
+            self.movie_ids, self.movie_index
+        )
+        self.movie_index[movie_id] = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        return self.movie_index[movie_id]
+
+    def add_star(self, p, m):
+        """
+        Adds the credit of person index `p` in movie index `m`.
+        Returns False if the credit was already present.
+        """
+        if m in self.movies_of(p):
+            return False
+        self.extra_movies.setdefault(p, []).append(m)
+        self.extra_stars.setdefault(m, []).append(p)
+        return True
+
+    def neighbors(self, p):
+        """
+        Returns (movie_index, person_index) pairs for people
+        who starred with person index `p`.
+        """
+        neighbors = set()
+        for m in self.movies_of(p):
+            for q in self.stars_of(m):
+                neighbors.add((m, q))
+        return neighbors
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        return {
+            (self.movie_ids[m], self.person_ids[q])
+            for m, q in self.neighbors(self.person_index[person_id])
+        }
+
+    def compacted(self):
+        """Returns a graph with the overlay folded into fresh CSR arrays."""
+        if not self.extra_movies and self.csr_people == len(self.person_ids) \
+                and self.csr_movies == len(self.movie_ids):
+            return self
+        sources = array("i")
+        targets = array("i")
+        for p in range(len(self.person_ids)):
+            movies = self.movies_of(p)
+            sources.extend(array("i", [p]) * len(movies))
+            targets.extend(movies)
+        return CompactGraph.from_columns(
+            list(self.person_ids), list(self.movie_ids), sources, targets
+        )
+
+    def nbytes(self):
+        """Returns the bytes used by the CSR offset and index arrays."""
+        return sum(
+            len(seq) * seq.itemsize
+            for seq in (self.person_offsets, self.person_movies,
+                        self.movie_offsets, self.movie_people)
+        )
+
+
+class Extended():
+    """A read-only base sequence followed by a list of appended items."""
+
+    def __init__(self, base):
+        self.base = base
+        self.extra = []
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def __getitem__(self, i):
+        if i < len(self.base):
+            return self.base[i]
+        return self.extra[i - len(self.base)]
+
+    def __iter__(self):
+        yield from self.base
+        yield from self.extra
+
+    def append(self, item):
+        self.extra.append(item)
+
+
+def appendable(ids, index):
+    """
+    Returns versions of an ID sequence and its ID-to-index mapping that
+    support append and item assignment, wrapping read-only ones.
+    """
+    if not isinstance(ids, (list, Extended)):
+        ids = Extended(ids)
+    if not isinstance(index, (dict, ChainMap)):
+        index = ChainMap({}, index)
+    return ids, index
+
+
+def dedupe(offsets, indices):
+    """
+    Sorts each CSR row and drops repeated indices within it.
+    Returns the new offsets and indices arrays.
+    """
+    new_offsets = array("i", [0])
+    new_indices = array("i")
+    for i in range(len(offsets) - 1):
+        new_indices.extend(sorted(set(indices[offsets[i]:offsets[i + 1]])))
+        new_offsets.append(len(new_indices))
+    return new_offsets, new_indices
+
+
+def csr(count, sources, targets):
+    """
+    Groups `targets` by `sources` (both int sequences of equal length)
+    into an offsets array of length count + 1 and an index array.
+    """
+    offsets = array("i", bytes(4 * (count + 1)))
+    for s in sources:
+        offsets[s + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    indices = array("i", bytes(4 * len(targets)))
+    cursor = offsets[:-1]
+    for s, t in zip(sources, targets):
+        indices[cursor[s]] = t
+        cursor[s] += 1
+    return offsets, indices
@@ -0,0 +1,206 @@
+"""
+Landmark distance oracle and A* search for degrees.
+
+BFS distances from a handful of landmark people bound the degrees of
+separation between any two people by the triangle inequality:
+
+    |d(L, s) - d(L, t)|  <=  d(s, t)  <=  d(L, s) + d(L, t)
+
+The lower bound is also an admissible (and consistent) heuristic for A*.
+"""
+
+import heapq
+import json
+from array import array
+from collections import deque
+from itertools import count
+
+import degrees
+from util import Node
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = -1
+
+
+def bfs_distances(source, order):
+    """
+    Returns an array of BFS distances from `source` to every person,
+    positioned by `order` (a dict from person_id to array position).
+    """
+    distances = array("h", [UNREACHABLE]) * len(order)
+    distances[order[source]] = 0
+    queue = deque([source])
+    while queue:
+        person_id = queue.popleft()
+        distance = distances[order[person_id]] + 1
+        for _, neighbor in degrees.neighbors_for_person(person_id):
+            i = order[neighbor]
+            if distances[i] == UNREACHABLE:
+                distances[i] = distance
+                queue.append(neighbor)
+    return distances
+
+
+class LandmarkOracle():
+
+    def __init__(self, landmarks, person_ids, distances):
+        """
+        `landmarks` is a list of person_ids, `person_ids` the order of
+        positions in each array, and `distances` one array per landmark.
+        """
+        self.landmarks = landmarks
+        self.person_ids = person_ids
+        self.order = {person_id: i for i, person_id in enumerate(person_ids)}
+        self.distances = distances
+
+    @classmethod
+    def build(cls, landmarks=None, count=8):
+        """
+        Runs a BFS from each landmark over the loaded data.
+
+        If `landmarks` is not given, `count` landmarks are chosen by
+        farthest-first selection within the component of the best-connected
+        person: each new landmark is the person there farthest from all
+        landmarks so far. People outside that component (e.g. people with
+        no credits) would only ever give a lower bound of 0.
+        """
+        person_ids = list(degrees.people)
+        order = {person_id: i for i, person_id in enumerate(person_ids)}
+        if landmarks is not None:
+            distances = [bfs_distances(landmark, order) for landmark in landmarks]
+            return cls(list(landmarks), person_ids, distances)
+
+        landmarks = []
+        distances = []
+        nearest = None
+        for _ in range(min(count, len(person_ids))):
+            if nearest is None:
+                landmark = max(person_ids, key=lambda person_id: len(
+                    degrees.neighbors_for_person(person_id)
+                ))
+            else:
+                # Unreached people (other components) have distance -1
+                i = max(range(len(person_ids)), key=nearest.__getitem__)
+                if nearest[i] <= 0:
+                    break
+                landmark = person_ids[i]
+            vector = bfs_distances(landmark, order)
+            landmarks.append(landmark)
+            distances.append(vector)
+            if nearest is None:
+                nearest = array("h", vector)
+            else:
+                for i, d in enumerate(vector):
+                    if d != UNREACHABLE and (nearest[i] == UNREACHABLE or d < nearest[i]):
+                        nearest[i] = d
+        return cls(landmarks, person_ids, distances)
+
+    def save(self, path):
+        """Writes the oracle to `path`: a JSON header line, then the arrays."""
+        header = {"landmarks": self.landmarks, "people": len(self.person_ids)}
+        with open(path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for vector in self.distances:
+                f.write(vector.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an oracle saved by `save`, against the currently loaded people
+        (which must be the same people, in the same order, as when built).
+        """
+        person_ids = list(degrees.people)
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            if header["people"] != len(person_ids):
+                raise ValueError("landmark file does not match loaded data")
+            distances = []
+            for _ in header["landmarks"]:
+                vector = array("h")
+                vector.fromfile(f, len(person_ids))
+                distances.append(vector)
+        return cls(header["landmarks"], person_ids, distances)
+
+    def pairs(self, source, target):
+        """Yields (d(L, source), d(L, target)) for each landmark L."""
+        s = self.order[source]
+        t = self.order[target]
+        for vector in self.distances:
+            yield vector[s], vector[t]
+
+    def connected(self, source, target):
+        """
+        Returns False if some landmark reaches exactly one of the two
+        people (so they are in different components), True otherwise.
+        """
+        return all(
+            (ds == UNREACHABLE) == (dt == UNREACHABLE)
+            for ds, dt in self.pairs(source, target)
+        )
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation between
+        two people. Upper is None if no landmark reaches both, and both are
+        None if the people are known to be disconnected.
+        """
+        lower, upper = 0, None
+        for ds, dt in self.pairs(source, target):
+            if ds == UNREACHABLE or dt == UNREACHABLE:
+                if ds != dt:
+                    return None, None
+                continue
+            lower = max(lower, abs(ds - dt))
+            if upper is None or ds + dt < upper:
+                upper = ds + dt
+        return lower, upper
+
+    def heuristic(self, person_id, target):
+        """
+        Admissible estimate of the degrees from person_id to target, for
+        two people already known to be connected: each landmark then
+        reaches both or neither, and neither gives |-1 - -1| = 0.
+        """
+        p = self.order[person_id]
+        t = self.order[target]
+        return max((abs(vector[p] - vector[t]) for vector in self.distances),
+                   default=0)
+
+
+def astar_shortest_path(source, target, oracle):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, by A* search guided
+    by the landmark lower bound.
+
+    If no possible path, returns None.
+    """
+    if not oracle.connected(source, target):
+        return None
+
+    tiebreak = count()
+    start = Node(state=source, parent=None, action=None)
+    frontier = [(oracle.heuristic(source, target), next(tiebreak), 0, start)]
+    cost = {source: 0}
+    explored = set()
+
+    while frontier:
+        _, _, g, node = heapq.heappop(frontier)
+        if node.state == target:
+            path = []
+            while node.parent is not None:
+                path.append((node.action, node.state))
+                node = node.parent
+            path.reverse()
+            return path
+        if node.state in explored:
+            continue
+        explored.add(node.state)
+        for movie, person in degrees.neighbors_for_person(node.state):
+            if person in explored or cost.get(person, g + 2) <= g + 1:
+                continue
+            cost[person] = g + 1
+            child = Node(state=person, parent=node, action=movie)
+            f = g + 1 + oracle.heuristic(person, target)
+            heapq.heappush(frontier, (f, next(tiebreak), g + 1, child))
+    return None
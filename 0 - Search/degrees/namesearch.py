@@ -0,0 +1,205 @@
+"""
+Prefix and fuzzy name lookup for degrees.
+
+Names are kept lowercased and sorted, so every name starting with a
+prefix is one contiguous range found by binary search; a second order,
+by length, finds the shortest of them. Fuzzy matches come from an
+inverted index of character 4-grams: candidates are gathered from the
+query's rarest grams, then ranked by gram similarity, using the gram
+count stored for each name rather than re-splitting it.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+# Characters per gram; 4-grams have far shorter posting lists than
+# trigrams, so fewer entries need reading per query
+GRAM = 4
+
+# Most posting-list entries read to gather fuzzy candidates for one query
+POSTINGS_BUDGET = 3000
+
+# Most candidates scored exactly for one fuzzy query
+CANDIDATES = 50
+
+
+def ngrams(name):
+    """Returns the set of character grams of a (lowercased) name."""
+    padded = " " * (GRAM - 1) + name + " "
+    return {padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)}
+
+
+class NameSearch():
+
+    def __init__(self, person_ids, keys, people, length_order, length_offsets,
+                 grams, gram_offsets, postings, gram_counts):
+        """
+        `keys` are the lowercased names in sorted order and `people` the
+        person index of each key, which `person_ids` maps to a person_id.
+        `length_order` lists the key positions by length, then name; the
+        keys of length n are at
+        `length_order[length_offsets[n]:length_offsets[n + 1]]`.
+        `grams` are the sorted grams; the key positions containing
+        `grams[i]` are `postings[gram_offsets[i]:gram_offsets[i + 1]]`,
+        in increasing order. `gram_counts` is the number of distinct
+        grams of each key.
+        """
+        self.person_ids = person_ids
+        self.keys = keys
+        self.people = people
+        self.length_order = length_order
+        self.length_offsets = length_offsets
+        self.grams = grams
+        self.gram_offsets = gram_offsets
+        self.postings = postings
+        self.gram_counts = gram_counts
+        # (lowercased name, person_id) pairs added since the index was built
+        self.added = []
+
+    @classmethod
+    def build(cls, person_ids, person_names):
+        """Builds the index for parallel sequences of person_ids and names."""
+        entries = sorted(
+            (name.lower(), i) for i, name in enumerate(person_names)
+        )
+        keys = [name for name, _ in entries]
+        people = array("i", (i for _, i in entries))
+
+        # Sorting is stable, so each length keeps its keys in name order
+        length_order = array("i", sorted(
+            range(len(keys)), key=lambda position: len(keys[position])
+        ))
+        length_offsets = array("q", [0])
+        for position in length_order:
+            while len(length_offsets) <= len(keys[position]) + 1:
+                length_offsets.append(length_offsets[-1])
+            length_offsets[-1] += 1
+
+        index = {}
+        gram_counts = array("H")
+        for position, key in enumerate(keys):
+            key_grams = ngrams(key)
+            gram_counts.append(min(len(key_grams), 0xFFFF))
+            for gram in key_grams:
+                index.setdefault(gram, array("i")).append(position)
+        grams = sorted(index)
+        gram_offsets = array("q", [0])
+        postings = array("i")
+        for gram in grams:
+            postings.extend(index[gram])
+            gram_offsets.append(len(postings))
+        return cls(person_ids, keys, people, length_order, length_offsets,
+                   grams, gram_offsets, postings, gram_counts)
+
+    def add(self, person_id, name):
+        """
+        Adds a person to the index. Added names are scanned linearly,
+        so rebuild the index once many have accumulated.
+        """
+        self.added.append((name.lower(), person_id))
+
+    def posting(self, gram):
+        """Returns the key positions of names containing `gram`."""
+        i = bisect_left(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return self.postings[0:0]
+        return self.postings[self.gram_offsets[i]:self.gram_offsets[i + 1]]
+
+    def prefix(self, query, limit=10):
+        """
+        Returns up to `limit` person_ids whose names start with `query`,
+        shortest names first.
+        """
+        query = query.lower()
+        lo = bisect_left(self.keys, query)
+        hi = bisect_right(self.keys, query + "\uffff")
+        if hi - lo <= limit:
+            positions = range(lo, hi)
+        else:
+            # Too many to sort: take each length's range, shortest first
+            positions = []
+            order, offsets = self.length_order, self.length_offsets
+            key = self.keys.__getitem__
+            length = len(query)
+            while len(positions) < limit and length + 1 < len(offsets):
+                end = offsets[length + 1]
+                i = bisect_left(order, query, offsets[length], end, key=key)
+                j = bisect_right(order, query + "\uffff", i, end, key=key)
+                positions.extend(order[i:min(j, i + limit - len(positions))])
+                length += 1
+        matches = [
+            (len(self.keys[position]), position, self.person_ids[self.people[position]])
+            for position in positions
+        ]
+        matches.extend(
+            (len(name), len(self.keys) + i, person_id)
+            for i, (name, person_id) in enumerate(self.added)
+            if name.startswith(query)
+        )
+        matches.sort()
+        return [person_id for _, _, person_id in matches[:limit]]
+
+    def fuzzy(self, query, limit=10):
+        """
+        Returns up to `limit` (person_id, score) pairs for the names most
+        similar to `query`, by Jaccard similarity of their grams.
+        """
+        query = query.lower()
+        grams = ngrams(query)
+        postings = sorted((self.posting(gram) for gram in grams), key=len)
+
+        # Count shared grams from the rarest lists until the budget runs
+        # out; the lists left over are only probed for the best candidates
+        counts = Counter()
+        read = 0
+        unread = []
+        for posting in postings:
+            if not len(posting):
+                continue
+            if read and read + len(posting) > POSTINGS_BUDGET:
+                unread.append(posting)
+                continue
+            counts.update(posting)
+            read += len(posting)
+
+        # Keep the names sharing the most grams: down to the lowest count
+        # that leaves at most CANDIDATES of them (or just the top count)
+        histogram = Counter(counts.values())
+        least = kept = 0
+        for count in sorted(histogram, reverse=True):
+            if kept and kept + histogram[count] > CANDIDATES:
+                break
+            kept += histogram[count]
+            least = count
+        candidates = [
+            position for position, count in counts.items() if count >= least
+        ]
+
+        scored = []
+        for rank, position in enumerate(candidates[:CANDIDATES]):
+            shared = counts[position]
+            for posting in unread:
+                i = bisect_left(posting, position)
+                if i < len(posting) and posting[i] == position:
+                    shared += 1
+            score = shared / (len(grams) + self.gram_counts[position] - shared)
+            scored.append((-score, rank, self.person_ids[self.people[position]]))
+        for rank, (name, person_id) in enumerate(self.added, CANDIDATES):
+            name_grams = ngrams(name)
+            score = len(grams & name_grams) / len(grams | name_grams)
+            if score > 0:
+                scored.append((-score, rank, person_id))
+        scored.sort()
+        return [(person_id, -score) for score, _, person_id in scored[:limit]]
+
+    def search(self, query, limit=10):
+        """
+        Returns up to `limit` ranked candidate person_ids for `query`:
+        exact and prefix matches (shortest names first) if there are any,
+        else fuzzy matches.
+        """
+        candidates = self.prefix(query, limit)
+        if candidates:
+            return candidates
+        return [person_id for person_id, _ in self.fuzzy(query, limit)]
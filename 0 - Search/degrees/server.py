@@ -0,0 +1,289 @@
+"""
+Long-running degrees query server.
+
+Loads the graph once and answers many queries, each a JSON object such as
+{"source": "Kevin Bacon", "target": "Tom Hanks"} (names or person IDs),
+one per line. Each answer is one JSON line with the path and timing.
+
+Usage:
+    python server.py [directory]                      # JSON lines on stdin
+    python server.py [directory] --socket PATH        # local Unix socket
+    python server.py [directory] --batch FILE [--output FILE]
+
+A query may set "max_expansions" and "max_seconds" search budgets,
+defaulting to --max-expansions and --max-seconds; a search that runs out
+answers with a "budget exceeded" error and its search statistics.
+Adding "paths": K to a query also returns up to K alternative shortest
+paths, within the same budget. The query {"lookup": "kevin bac"} returns
+ranked candidate people for a partial or misspelled name. With --cache,
+co-star adjacency is cached (0 precomputes everyone) and the query
+{"stats": true} returns the cache counters.
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import stat
+import sys
+import time
+import traceback
+
+import degrees
+from util import BudgetExceeded, SearchStats
+
+# Default search budgets, overridden per query by "max_expansions"/"max_seconds"
+budget = {"max_expansions": None, "max_seconds": None}
+
+
+def resolve(person):
+    """
+    Returns the person_id for a person ID or name, without prompting.
+    Raises ValueError if the person is unknown or the name is ambiguous.
+    """
+    if person in degrees.people:
+        return person
+    person_ids = degrees.names.get(person.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    if not person_ids:
+        candidates = degrees.candidates_for_name(person, 5)
+        raise ValueError(f"person not found: {person}; did you mean {candidates}?")
+    raise ValueError(f"ambiguous name {person!r}: {sorted(person_ids)}")
+
+
+def nonnegative(query, key, convert, default=None):
+    """
+    Returns query[key] (or `default` if absent) converted by `convert`.
+    Raises ValueError unless it is a non-negative number.
+    """
+    value = query.get(key, default)
+    if value is None:
+        return None
+    try:
+        value = convert(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number")
+    if not value >= 0:
+        raise ValueError(f"{key} must not be negative")
+    return value
+
+
+def answer(query):
+    """
+    Answers one query dict with "source" and "target" keys.
+
+    Returns a JSON-ready dict with the degrees of separation and path,
+    or with an "error" message if the query could not be answered.
+    """
+    if query.get("stats"):
+        if degrees.adjacency is None:
+            return {"error": "no adjacency cache in use"}
+        return {"adjacency": degrees.adjacency.stats()}
+
+    if "lookup" in query:
+        start = time.perf_counter()
+        try:
+            limit = nonnegative(query, "limit", int, 10)
+        except ValueError as e:
+            return {"error": str(e)}
+        candidates = degrees.candidates_for_name(str(query["lookup"]), limit)
+        return {
+            "candidates": [
+                {"person_id": person_id, "name": degrees.people[person_id]["name"],
+                 "birth": degrees.people[person_id]["birth"]}
+                for person_id in candidates
+            ],
+            "seconds": time.perf_counter() - start,
+        }
+
+    start = time.perf_counter()
+    source, target = query.get("source"), query.get("target")
+    if not isinstance(source, str) or not isinstance(target, str):
+        return {"error": "query needs 'source' and 'target'"}
+    try:
+        source = resolve(source)
+        target = resolve(target)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    try:
+        stats = SearchStats(
+            nonnegative(query, "max_expansions", int, budget["max_expansions"]),
+            nonnegative(query, "max_seconds", float, budget["max_seconds"])
+        )
+        paths = nonnegative(query, "paths", int, 0)
+    except ValueError as e:
+        return {"error": str(e)}
+    try:
+        path = degrees.bidirectional_shortest_path(source, target, stats)
+    except BudgetExceeded:
+        return budget_exceeded(source, target, stats, start)
+    response = {
+        "source": source,
+        "target": target,
+        "degrees": None if path is None else len(path),
+        "path": None,
+        "search": stats.as_dict(),
+        "seconds": time.perf_counter() - start,
+    }
+    if path is not None:
+        response["path"] = describe(path)
+        if paths:
+            try:
+                response["paths"] = [
+                    describe(alternative)
+                    for alternative in degrees.all_shortest_paths(
+                        source, target, paths, stats
+                    )
+                ]
+            except BudgetExceeded:
+                stats.finish()
+                return budget_exceeded(source, target, stats, start)
+            stats.finish()
+            response["search"] = stats.as_dict()
+            response["seconds"] = time.perf_counter() - start
+    return response
+
+
+def budget_exceeded(source, target, stats, start):
+    """Returns the response to a query whose search ran out of budget."""
+    return {
+        "source": source,
+        "target": target,
+        "error": "budget exceeded",
+        "search": stats.as_dict(),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def describe(path):
+    """Returns a JSON-ready list of the steps of a path."""
+    return [
+        {
+            "movie_id": movie_id,
+            "title": degrees.movies[movie_id]["title"],
+            "person_id": person_id,
+            "name": degrees.people[person_id]["name"],
+        }
+        for movie_id, person_id in path
+    ]
+
+
+def answer_line(line):
+    """
+    Answers one JSON line, returning the JSON response line. A query that
+    fails unexpectedly gets an error response (its traceback goes to
+    stderr), so one bad query cannot stop the server.
+    """
+    try:
+        query = json.loads(line)
+    except json.JSONDecodeError as e:
+        response = {"error": f"invalid JSON: {e}"}
+    else:
+        if isinstance(query, dict):
+            try:
+                response = answer(query)
+            except Exception as e:
+                traceback.print_exc(file=sys.stderr)
+                response = {"error": f"internal error: {type(e).__name__}: {e}"}
+        else:
+            response = {"error": "query must be a JSON object"}
+        if isinstance(query, dict) and "id" in query:
+            response["id"] = query["id"]
+    return json.dumps(response) + "\n"
+
+
+def serve_stream(lines, out):
+    """Answers each non-blank line of `lines`, writing responses to `out`."""
+    for line in lines:
+        if line.strip():
+            out.write(answer_line(line))
+            out.flush()
+
+
+def serve_batch(path, out):
+    """
+    Answers every query in the file at `path`, writing responses to `out`,
+    and prints a throughput summary to stderr.
+    """
+    start = time.perf_counter()
+    count = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                out.write(answer_line(line))
+                count += 1
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0.0
+    print(f"{count} queries in {elapsed:.2f}s ({rate:.0f}/s)", file=sys.stderr)
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            line = line.decode("utf-8")
+            if line.strip():
+                self.wfile.write(answer_line(line).encode("utf-8"))
+
+
+def serve_socket(path):
+    """
+    Answers JSON-line queries from clients of a Unix socket at `path`,
+    replacing a stale socket there but refusing to remove any other file.
+    """
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            sys.exit(f"{path} exists and is not a socket")
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, QueryHandler) as server:
+        print(f"Listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer degrees queries.")
+    parser.add_argument("directory", nargs="?", default="large")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--socket", help="listen on this Unix socket path")
+    mode.add_argument("--batch", help="answer every query in this file")
+    parser.add_argument("--output", help="write batch answers to this file")
+    parser.add_argument("--cache", type=int, metavar="SIZE",
+                        help="LRU co-star cache size (0 to precompute)")
+    parser.add_argument("--max-expansions", type=int,
+                        help="default budget of people expanded per query")
+    parser.add_argument("--max-seconds", type=float,
+                        help="default search time budget per query")
+    args = parser.parse_args()
+    budget["max_expansions"] = args.max_expansions
+    budget["max_seconds"] = args.max_seconds
+
+    start = time.perf_counter()
+    degrees.load_data(
+        args.directory, snapshot=f"{args.directory}/degrees.snapshot"
+    )
+    if args.cache is not None:
+        degrees.use_adjacency_cache(
+            maxsize=args.cache or None, precompute=args.cache == 0
+        )
+    print(f"Data loaded in {time.perf_counter() - start:.2f}s.", file=sys.stderr)
+
+    if args.socket:
+        serve_socket(args.socket)
+    elif args.batch:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as out:
+                serve_batch(args.batch, out)
+        else:
+            serve_batch(args.batch, sys.stdout)
+    else:
+        serve_stream(sys.stdin, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
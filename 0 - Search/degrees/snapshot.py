@@ -0,0 +1,343 @@
+"""
+Binary snapshot of a loaded degrees dataset.
+
+A snapshot holds the compact graph arrays plus the people, movie and
+name tables and the name search index, and is reloaded through mmap so
+startup does not re-parse the CSVs. It records the size and mtime of
+each source CSV and is treated as stale as soon as any of them change.
+
+Rows added later through degrees.add_data are appended to a JSON-lines
+journal next to the snapshot, each entry stamped with the CSVs' state
+after the rows were appended to them, and replayed on load.
+
+Layout: MAGIC, a little-endian uint32 header length, a JSON header
+describing each section's (offset, length, typecode), then the
+8-byte-aligned sections themselves.
+"""
+
+import json
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from collections import ChainMap
+
+from graph import CompactGraph, Extended
+from namesearch import NameSearch
+
+MAGIC = b"DEGSNAP4"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+
+class StringTable():
+    """Sequence of strings stored as a UTF-8 blob and an offsets array."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class SortedIndex(Mapping):
+    """
+    Maps each string of a StringTable to its position, by binary search
+    over a permutation of the positions sorted by string.
+    """
+
+    def __init__(self, strings, order):
+        self.strings = strings
+        self.order = order
+
+    def __getitem__(self, key):
+        i = bisect_left(self.order, key, key=self.strings.__getitem__)
+        if i < len(self.order) and self.strings[self.order[i]] == key:
+            return self.order[i]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.strings)
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class RecordTable(Mapping):
+    """
+    Mapping from ID to a dict of fields, in the same shape as the `people`
+    and `movies` dicts built by load_data. Records assigned after loading
+    are kept in an overlay in front of the snapshot's columns.
+    """
+
+    def __init__(self, index, columns):
+        self.index = index
+        self.columns = columns
+        self.extra = {}
+
+    def __getitem__(self, key):
+        if key in self.extra:
+            return self.extra[key]
+        i = self.index[key]
+        return {name: column[i] for name, column in self.columns.items()}
+
+    def __setitem__(self, key, record):
+        self.extra[key] = record
+
+    def __iter__(self):
+        yield from self.index
+        for key in self.extra:
+            if key not in self.index:
+                yield key
+
+    def __len__(self):
+        return len(self.index) + sum(1 for key in self.extra if key not in self.index)
+
+
+class NameIndex(Mapping):
+    """
+    Maps lowercased names to sets of person_ids, in the same shape as the
+    `names` dict, using sorted name keys with their person indexes.
+    """
+
+    def __init__(self, keys, people, person_ids):
+        self.keys = keys
+        self.people = people
+        self.person_ids = person_ids
+        # Maps names added or dropped after loading to their sets of person_ids
+        self.extra = {}
+        self.removed = {}
+
+    def span(self, name):
+        """Returns the range of key positions equal to `name`."""
+        return bisect_left(self.keys, name), bisect_right(self.keys, name)
+
+    def add(self, name, person_id):
+        """Records that person_id has the (lowercased) `name`."""
+        self.extra.setdefault(name, set()).add(person_id)
+
+    def discard(self, name, person_id):
+        """Records that person_id no longer has the (lowercased) `name`."""
+        self.extra.get(name, set()).discard(person_id)
+        self.removed.setdefault(name, set()).add(person_id)
+
+    def __getitem__(self, name):
+        lo, hi = self.span(name)
+        person_ids = {self.person_ids[self.people[i]] for i in range(lo, hi)}
+        person_ids -= self.removed.get(name, set())
+        person_ids |= self.extra.get(name, set())
+        if not person_ids:
+            raise KeyError(name)
+        return person_ids
+
+    def __iter__(self):
+        previous = None
+        for key in self.keys:
+            if key != previous and (key not in self.removed or key in self):
+                yield key
+            previous = key
+        for key in self.extra:
+            if self.span(key)[0] == self.span(key)[1] and self.extra[key]:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def source_stamps(directory):
+    """Returns the (size, mtime_ns) of each source CSV in `directory`."""
+    stamps = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stamps[name] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+def write_snapshot(path, directory, graph, people, movies, name_search):
+    """
+    Writes `graph`, the `people`/`movies` tables and the `name_search`
+    index to a snapshot at `path`, stamped with the current state of the
+    CSVs in `directory`. The temporary file written first is removed if
+    writing fails.
+    """
+    graph = graph.compacted()
+    person_ids = list(graph.person_ids)
+    movie_ids = list(graph.movie_ids)
+    if name_search.added:
+        name_search = NameSearch.build(
+            person_ids, [people[person_id]["name"] for person_id in person_ids]
+        )
+
+    sections = {}
+
+    def add(name, values, typecode):
+        sections[name] = array(typecode, values)
+
+    def add_strings(name, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = array("q", [0])
+        for s in encoded:
+            offsets.append(offsets[-1] + len(s))
+        sections[f"{name}_offsets"] = offsets
+        sections[f"{name}_blob"] = b"".join(encoded)
+
+    add("person_offsets", graph.person_offsets, "i")
+    add("person_movies", graph.person_movies, "i")
+    add("movie_offsets", graph.movie_offsets, "i")
+    add("movie_people", graph.movie_people, "i")
+    add_strings("person_id", person_ids)
+    add_strings("person_name", (people[p]["name"] for p in person_ids))
+    add_strings("person_birth", (people[p]["birth"] for p in person_ids))
+    add_strings("movie_id", movie_ids)
+    add_strings("movie_title", (movies[m]["title"] for m in movie_ids))
+    add_strings("movie_year", (movies[m]["year"] for m in movie_ids))
+    add("person_order", sorted(range(len(person_ids)), key=person_ids.__getitem__), "i")
+    add("movie_order", sorted(range(len(movie_ids)), key=movie_ids.__getitem__), "i")
+    add_strings("name_key", name_search.keys)
+    add("name_person", name_search.people, "i")
+    add("name_length_order", name_search.length_order, "i")
+    add("name_length_offsets", name_search.length_offsets, "q")
+    add_strings("gram", name_search.grams)
+    add("posting_offsets", name_search.gram_offsets, "q")
+    add("gram_postings", name_search.postings, "i")
+    add("name_grams", name_search.gram_counts, "H")
+
+    layout = {}
+    offset = 0
+    for name, data in sections.items():
+        size = len(data) * data.itemsize if isinstance(data, array) else len(data)
+        typecode = data.typecode if isinstance(data, array) else "B"
+        layout[name] = [offset, size, typecode]
+        offset += size + (-size % 8)
+    header = json.dumps({
+        "sources": source_stamps(directory),
+        "sections": layout,
+    }).encode("utf-8")
+    start = len(MAGIC) + 4 + len(header)
+    padding = -start % 8
+
+    # Write to a temporary file first so readers never see a partial snapshot
+    temporary = f"{path}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header) + padding))
+            f.write(header + b" " * padding)
+            for name, data in sections.items():
+                raw = data.tobytes() if isinstance(data, array) else data
+                f.write(raw)
+                f.write(b"\0" * (-len(raw) % 8))
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    if os.path.exists(journal_path(path)):
+        os.remove(journal_path(path))
+
+
+def journal_path(path):
+    return f"{path}.journal"
+
+
+def append_journal(path, directory, entry):
+    """
+    Appends `entry`, a dict of added "people", "movies" and "stars" rows,
+    to the journal of the snapshot at `path`, stamped with the current
+    state of the CSVs in `directory`.
+    """
+    entry = dict(entry, sources=source_stamps(directory))
+    with open(journal_path(path), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def read_journal(path):
+    """Returns the entries of the journal of the snapshot at `path`."""
+    try:
+        with open(journal_path(path), encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def read_header(f):
+    """Returns the parsed header and the offset its sections start at."""
+    if f.read(len(MAGIC)) != MAGIC:
+        return None, None
+    (length,) = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(length))
+    return header, len(MAGIC) + 4 + length
+
+
+def load_snapshot(path, directory):
+    """
+    Memory-maps the snapshot at `path`.
+
+    Returns (people, movies, names, name_search, graph, journal), where
+    `journal` lists the entries to replay on top of the snapshot, or None
+    if the snapshot is missing, unreadable, or stale with respect to the
+    CSVs in `directory`.
+    """
+    try:
+        journal = read_journal(path)
+        with open(path, "rb") as f:
+            header, start = read_header(f)
+            if header is None:
+                return None
+            sources = journal[-1]["sources"] if journal else header["sources"]
+            if sources != source_stamps(directory):
+                return None
+            buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except (OSError, ValueError, struct.error):
+        return None
+
+    def section(name):
+        offset, size, typecode = header["sections"][name]
+        view = buffer[start + offset:start + offset + size]
+        return view if typecode == "B" else view.cast(typecode)
+
+    def strings(name):
+        return StringTable(section(f"{name}_offsets"), section(f"{name}_blob"))
+
+    person_ids = strings("person_id")
+    movie_ids = strings("movie_id")
+    person_index = SortedIndex(person_ids, section("person_order"))
+    movie_index = SortedIndex(movie_ids, section("movie_order"))
+
+    # Shared appendable views, so people added later are visible everywhere
+    person_ids_view = Extended(person_ids)
+    graph = CompactGraph(
+        person_ids_view, Extended(movie_ids),
+        section("person_offsets"), section("person_movies"),
+        section("movie_offsets"), section("movie_people"),
+        person_index=ChainMap({}, person_index),
+        movie_index=ChainMap({}, movie_index)
+    )
+    people = RecordTable(person_index, {
+        "name": strings("person_name"),
+        "birth": strings("person_birth"),
+    })
+    movies = RecordTable(movie_index, {
+        "title": strings("movie_title"),
+        "year": strings("movie_year"),
+    })
+    name_keys = strings("name_key")
+    name_people = section("name_person")
+    names = NameIndex(name_keys, name_people, person_ids_view)
+    name_search = NameSearch(
+        person_ids_view, name_keys, name_people,
+        section("name_length_order"), section("name_length_offsets"),
+        strings("gram"), section("posting_offsets"), section("gram_postings"),
+        section("name_grams")
+    )
+    return people, movies, names, name_search, graph, journal
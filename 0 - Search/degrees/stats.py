@@ -0,0 +1,176 @@
+"""
+Graph-wide degrees of separation statistics.
+
+Runs many single-source BFS traversals in a process pool. Every worker
+memory-maps the same snapshot file, so the graph is shared through the
+page cache rather than copied into each process.
+
+Usage:
+    python stats.py [directory] [--source NAME_OR_ID ...] [--samples N]
+                    [--workers N] [--seed N]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from array import array
+from collections import Counter
+from multiprocessing import Pool
+
+import degrees
+
+UNREACHED = -1
+
+
+def snapshot_path(directory):
+    return f"{directory}/degrees.snapshot"
+
+
+def init_worker(directory):
+    """Pool initializer: maps the snapshot into this worker process."""
+    degrees.load_data(directory, snapshot=snapshot_path(directory))
+
+
+def bfs_levels(graph, source):
+    """
+    Runs a BFS over person indexes from person index `source`.
+
+    Returns an array of distances (UNREACHED for people not reached).
+    Each movie is expanded at most once, since every star of a movie
+    is reached at the same depth.
+    """
+    distances = array("h", [UNREACHED]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    distances[source] = 0
+    layer = [source]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for p in layer:
+            for m in graph.movies_of(p):
+                if seen_movies[m]:
+                    continue
+                seen_movies[m] = 1
+                for q in graph.stars_of(m):
+                    if distances[q] == UNREACHED:
+                        distances[q] = depth
+                        next_layer.append(q)
+        layer = next_layer
+    return distances
+
+
+def distribution(source):
+    """
+    Pool task: returns (source, histogram of distances, eccentricity)
+    for one person index, where eccentricity is the largest finite distance.
+    """
+    distances = bfs_levels(degrees.graph, source)
+    histogram = Counter(distances)
+    unreached = histogram.pop(UNREACHED, 0)
+    eccentricity = max(histogram)
+    histogram = {str(d): n for d, n in sorted(histogram.items())}
+    if unreached:
+        histogram["unreached"] = unreached
+    return source, histogram, eccentricity
+
+
+def components(graph):
+    """Returns the sizes of the graph's connected components, largest first."""
+    component = array("i", [UNREACHED]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    sizes = []
+    for start in range(len(graph.person_ids)):
+        if component[start] != UNREACHED:
+            continue
+        label = len(sizes)
+        component[start] = label
+        stack = [start]
+        size = 0
+        while stack:
+            p = stack.pop()
+            size += 1
+            for m in graph.movies_of(p):
+                if seen_movies[m]:
+                    continue
+                seen_movies[m] = 1
+                for q in graph.stars_of(m):
+                    if component[q] == UNREACHED:
+                        component[q] = label
+                        stack.append(q)
+        sizes.append(size)
+    return sorted(sizes, reverse=True)
+
+
+def run(directory, sources=(), samples=0, workers=None, seed=None):
+    """
+    Computes distance histograms from each person_id in `sources` and from
+    `samples` random people, plus component sizes, using `workers` processes.
+
+    Returns a JSON-ready dict of results.
+    """
+    start = time.perf_counter()
+    degrees.load_data(directory, snapshot=snapshot_path(directory))
+    graph = degrees.graph
+
+    indexes = [graph.person_index[source] for source in sources]
+    population = len(graph.person_ids)
+    sampled = random.Random(seed).sample(range(population), min(samples, population))
+
+    with Pool(workers, initializer=init_worker, initargs=(directory,)) as pool:
+        results = pool.map(distribution, indexes + sampled, chunksize=1)
+
+    sizes = components(graph)
+    return {
+        "distributions": {
+            graph.person_ids[source]: histogram
+            for source, histogram, _ in results[:len(indexes)]
+        },
+        "eccentricity_samples": {
+            graph.person_ids[source]: eccentricity
+            for source, _, eccentricity in results[len(indexes):]
+        },
+        "components": {
+            "count": len(sizes),
+            "largest": sizes[:10],
+            "size_histogram": {
+                str(size): n for size, n in sorted(Counter(sizes).items())
+            },
+        },
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees of separation statistics.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--source", action="append", default=[],
+                        help="person name or ID to compute a distribution from")
+    parser.add_argument("--samples", type=int, default=0,
+                        help="number of random people to sample eccentricity from")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    # Resolve names in the parent so ambiguities can be reported up front
+    degrees.load_data(args.directory, snapshot=snapshot_path(args.directory))
+    sources = []
+    for source in args.source:
+        if source in degrees.people:
+            sources.append(source)
+            continue
+        person_ids = degrees.names.get(source.lower(), set())
+        if len(person_ids) != 1:
+            sys.exit(f"Cannot resolve {source!r} to one person: {sorted(person_ids)}")
+        sources.extend(person_ids)
+
+    results = run(args.directory, sources, args.samples, args.workers, args.seed)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
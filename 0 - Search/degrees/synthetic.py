@@ -0,0 +1,89 @@
+"""
+Synthetic degrees dataset generator.
+
+Writes people.csv, movies.csv and stars.csv in the same format as the
+shipped datasets. Cast sizes follow a power law, and stars are drawn
+with Zipf-distributed popularity, so a few prolific actors appear in
+many movies, as on IMDb.
+
+Usage:
+    python synthetic.py DIRECTORY [--people N] [--movies N]
+                       [--mean-cast N] [--alpha A] [--seed N]
+"""
+
+import argparse
+import csv
+import os
+import random
+from itertools import accumulate
+
+FIRST = ["Ada", "Ben", "Cara", "Dev", "Emma", "Finn", "Gia", "Hugo", "Iris",
+         "Jack", "Kira", "Leo", "Mia", "Noah", "Olga", "Paul", "Quinn", "Rosa",
+         "Sam", "Tom", "Uma", "Vic", "Wes", "Xena", "Yuri", "Zoe"]
+LAST = ["Adams", "Baker", "Chen", "Diaz", "Evans", "Fox", "Garcia", "Hill",
+        "Ito", "Jones", "Khan", "Lopez", "Moore", "Nguyen", "Ortiz", "Patel",
+        "Reed", "Smith", "Turner", "Usman", "Vance", "Wu", "Young", "Zhang"]
+WORDS = ["Night", "Return", "Dark", "Star", "City", "Last", "Lost", "River",
+         "Secret", "Storm", "Summer", "King", "Road", "Fire", "Dream", "Glass"]
+
+
+def generate(directory, people=10000, movies=2000, mean_cast=8, alpha=0.8,
+             seed=0):
+    """
+    Writes a synthetic dataset of `people` people and `movies` movies to
+    `directory`. Cast sizes are power-law distributed with roughly
+    `mean_cast` stars per movie; the person of popularity rank r is drawn
+    with weight 1 / r ** alpha.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(f"{directory}/people.csv", "w", encoding="utf-8", newline="") as f:
+        f.write("id,name,birth\n")
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        for i in range(people):
+            name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+            writer.writerow([i + 1, name, rng.randint(1920, 2005)])
+
+    with open(f"{directory}/movies.csv", "w", encoding="utf-8", newline="") as f:
+        f.write("id,title,year\n")
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        for i in range(movies):
+            title = " ".join(rng.choices(WORDS, k=rng.randint(1, 3)))
+            writer.writerow([i + 1, title, rng.randint(1930, 2023)])
+
+    # Shuffle so popularity rank is unrelated to ID order
+    ranked = list(range(1, people + 1))
+    rng.shuffle(ranked)
+    weights = list(accumulate(1 / (rank + 1) ** alpha for rank in range(people)))
+
+    with open(f"{directory}/stars.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie_id in range(1, movies + 1):
+            # Pareto cast sizes with shape 2 have mean 2 * minimum
+            cast = min(people, max(1, int(rng.paretovariate(2) * mean_cast / 2)))
+            stars = set()
+            while len(stars) < cast:
+                stars.update(ranked[i] for i in rng.choices(
+                    range(people), cum_weights=weights, k=cast - len(stars)
+                ))
+            for person_id in sorted(stars):
+                writer.writerow([person_id, movie_id])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset.")
+    parser.add_argument("directory")
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--movies", type=int, default=2000)
+    parser.add_argument("--mean-cast", type=int, default=8)
+    parser.add_argument("--alpha", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate(args.directory, args.people, args.movies, args.mean_cast,
+             args.alpha, args.seed)
+
+
+if __name__ == "__main__":
+    main()
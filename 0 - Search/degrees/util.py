@@ -1,3 +1,7 @@
+import time
+from collections import Counter, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -7,13 +11,16 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Counts nodes per state so contains_state is a hash lookup
+        self.states = Counter()
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] += 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +29,15 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard_state(node.state)
             return node
 
+    def discard_state(self, state):
+        self.states[state] -= 1
+        if self.states[state] == 0:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +45,52 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard_state(node.state)
             return node
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class SearchStats():
+    def __init__(self, max_expansions=None, max_seconds=None):
+        """
+        Collects statistics for one search: nodes expanded, peak frontier
+        size, explored-set size and wall time. If a budget is given,
+        `expand` raises BudgetExceeded once it is used up.
+        """
+        self.max_expansions = max_expansions
+        self.max_seconds = max_seconds
+        self.expanded = 0
+        self.peak_frontier = 0
+        self.explored = 0
+        self.seconds = 0.0
+        self.exceeded = False
+        self.started = time.perf_counter()
+
+    def expand(self, frontier_size, explored_size):
+        """Records the expansion of one node, if the budget allows it."""
+        if ((self.max_expansions is not None
+             and self.expanded >= self.max_expansions)
+                or (self.max_seconds is not None
+                    and time.perf_counter() - self.started > self.max_seconds)):
+            self.exceeded = True
+            raise BudgetExceeded("search budget exceeded")
+        self.expanded += 1
+        self.peak_frontier = max(self.peak_frontier, frontier_size)
+        self.explored = explored_size
+
+    def finish(self):
+        """Records the wall time since the search started."""
+        self.seconds = time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            "expanded": self.expanded,
+            "peak_frontier": self.peak_frontier,
+            "explored": self.explored,
+            "seconds": self.seconds,
+            "exceeded": self.exceeded,
+        }
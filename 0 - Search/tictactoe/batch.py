@@ -0,0 +1,101 @@
+"""
+Batch evaluation of tic-tac-toe positions.
+
+Boards are encoded as rows of an (N, 9) integer array, square (i, j) in
+column 3 * i + j, with EMPTY as 0, X as 1 and O as 2 (the digits of
+tictactoe.book_index). Win status is computed for every board at once
+over the eight winning lines; optimal actions are looked up in the
+opening book, falling back to tictactoe's cached search for boards the
+book does not cover.
+"""
+
+import numpy as np
+
+import tictactoe as ttt
+
+# Squares of the eight winning lines, as column indexes
+LINES = np.array([
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],  # rows
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],  # columns
+    [0, 4, 8], [2, 4, 6],             # diagonals
+])
+
+# Place values turning a row of cells into its book index
+POWERS = 3 ** np.arange(8, -1, -1)
+
+# Action square returned for boards with no move to make
+NO_ACTION = -1
+
+
+def encode(boards):
+    """Returns the (N, 9) array of a sequence of list-of-lists boards."""
+    digits = {ttt.EMPTY: 0, ttt.X: 1, ttt.O: 2}
+    return np.array(
+        [[digits[square] for row in board for square in row] for board in boards],
+        dtype=np.uint8
+    ).reshape(-1, 9)
+
+
+def decode(cells):
+    """Returns the list-of-lists board of one row of cells."""
+    marks = (ttt.EMPTY, ttt.X, ttt.O)
+    return [[marks[cells[3 * i + j]] for j in range(3)] for i in range(3)]
+
+
+def indexes(cells):
+    """Returns the book index of each board."""
+    return np.asarray(cells, dtype=np.int64) @ POWERS
+
+
+def winners(cells):
+    """
+    Returns an array with 1 where X has won, 2 where O has won and 0
+    where neither has.
+    """
+    lines = np.asarray(cells)[:, LINES]
+    x_wins = (lines == 1).all(axis=2).any(axis=1)
+    o_wins = (lines == 2).all(axis=2).any(axis=1)
+    return np.where(x_wins, 1, np.where(o_wins, 2, 0)).astype(np.uint8)
+
+
+def terminals(cells):
+    """Returns a boolean array, True where the game is over."""
+    cells = np.asarray(cells)
+    return (winners(cells) != 0) | (cells != 0).all(axis=1)
+
+
+def utilities(cells):
+    """Returns 1 where X has won, -1 where O has won, 0 elsewhere."""
+    return np.array([0, 1, -1], dtype=np.int8)[winners(cells)]
+
+
+def optimal(cells):
+    """
+    Returns (values, actions) for each board: the minimax value for X,
+    and the square 3 * i + j of the optimal action (NO_ACTION on
+    finished boards).
+    """
+    index = indexes(cells)
+    book = np.frombuffer(ttt.load_book(), dtype=np.uint8)
+    entries = np.full(len(index), ttt.NOT_IN_BOOK, dtype=np.uint8)
+    covered = index < len(book)
+    entries[covered] = book[index[covered]]
+
+    # Solve each distinct board the book lacks once, through the cache
+    missing = entries == ttt.NOT_IN_BOOK
+    if missing.any():
+        _, first, inverse = np.unique(
+            index[missing], return_index=True, return_inverse=True
+        )
+        rows = np.asarray(cells)[missing][first]
+        solved = np.empty(len(rows), dtype=np.uint8)
+        for k, row in enumerate(rows):
+            value, action = ttt.recursion(decode(row))
+            square = ttt.NO_MOVE if action is None else 3 * action[0] + action[1]
+            solved[k] = (value + 1) << 4 | square
+        entries[missing] = solved[inverse]
+
+    values = (entries >> 4).astype(np.int8) - 1
+    actions = (entries & 0x0F).astype(np.int8)
+    actions[actions == ttt.NO_MOVE] = NO_ACTION
+    return values, actions
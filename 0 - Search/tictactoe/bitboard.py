@@ -0,0 +1,179 @@
+"""
+Tic Tac Toe Player using bitboards
+
+A board is a pair of 9-bit integers (x, o), one bit per square, where
+square (i, j) is bit 3 * i + j. The functions at the bottom take and
+return list-of-lists boards like tictactoe.py, so runner.py can use this
+module in its place.
+"""
+
+from contextlib import nullcontext
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# The eight winning lines as bit masks
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+
+# WINS[bits] is True if that set of squares contains a winning line
+WINS = [any(bits & mask == mask for mask in WIN_MASKS) for bits in range(1 << 9)]
+
+# Bit of each square, and square of each bit
+SQUARES = [(i, j) for i in range(3) for j in range(3)]
+BITS = {square: 1 << k for k, square in enumerate(SQUARES)}
+
+# Counters for profiling (a profiling.SearchStats), or None when off
+stats = None
+
+
+def to_bits(board):
+    """Returns the (x, o) bitboards of a list-of-lists board."""
+    x = o = 0
+    for k, (i, j) in enumerate(SQUARES):
+        if board[i][j] == X:
+            x |= 1 << k
+        elif board[i][j] == O:
+            o |= 1 << k
+    return x, o
+
+
+def to_board(x, o):
+    """Returns the list-of-lists board of (x, o) bitboards."""
+    return [
+        [X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+         for j in range(3)]
+        for i in range(3)
+    ]
+
+
+def bb_player(x, o):
+    """Returns player who has the next turn."""
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def bb_actions(x, o):
+    """Returns the bits of the empty squares, in square order."""
+    empty = FULL & ~(x | o)
+    return [bit for bit in (1 << k for k in range(9)) if empty & bit]
+
+
+def bb_result(x, o, bit):
+    """Returns the (x, o) boards after the player to move takes `bit`."""
+    if (x | o) & bit or not FULL & bit:
+        raise Exception("Not a valid move!")
+    if x.bit_count() == o.bit_count():
+        return x | bit, o
+    return x, o | bit
+
+
+def bb_winner(x, o):
+    """Returns the winner of the game, if there is one."""
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def bb_terminal(x, o):
+    """Returns True if game is over, False otherwise."""
+    return WINS[x] or WINS[o] or (x | o) == FULL
+
+
+def bb_utility(x, o):
+    """Returns 1 if X has won the game, -1 if O has won, 0 otherwise."""
+    if WINS[x]:
+        return 1
+    if WINS[o]:
+        return -1
+    return 0
+
+
+def bb_recursion(x, o):
+    """Returns (value, bit) of the optimal move for the player to move."""
+    if stats is not None:
+        stats.node((x | o).bit_count(), terminal=bb_terminal(x, o))
+    if bb_terminal(x, o):
+        return (bb_utility(x, o), None)
+    maximizing = x.bit_count() == o.bit_count()
+    value = -2 if maximizing else 2
+    best_action = None
+    for bit in bb_actions(x, o):
+        if maximizing:
+            new_value = bb_recursion(x | bit, o)[0]
+            if new_value > value:
+                value, best_action = new_value, bit
+        else:
+            new_value = bb_recursion(x, o | bit)[0]
+            if new_value < value:
+                value, best_action = new_value, bit
+    return (value, best_action)
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return to_board(0, 0)
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return bb_player(*to_bits(board))
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = to_bits(board)
+    return {SQUARES[bit.bit_length() - 1] for bit in bb_actions(x, o)}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    if action not in BITS:
+        raise Exception("Not a valid move!")
+    return to_board(*bb_result(*to_bits(board), BITS[action]))
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    return bb_winner(*to_bits(board))
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return bb_terminal(*to_bits(board))
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return bb_utility(*to_bits(board))
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    x, o = to_bits(board)
+    with stats.call((x | o).bit_count()) if stats is not None else nullcontext():
+        bit = bb_recursion(x, o)[1]
+    return None if bit is None else SQUARES[bit.bit_length() - 1]
@@ -0,0 +1,43 @@
+"""
+Builds the tic-tac-toe opening book.
+
+Solves every position reachable from the empty board once and writes
+one byte per board to tictactoe.BOOK_PATH, so minimax can answer any
+position by table lookup.
+
+Usage: python book.py [path]
+"""
+
+import sys
+
+import tictactoe as ttt
+
+
+def reachable(board, seen):
+    """Adds the book index of every position reachable from board to seen."""
+    index = ttt.book_index(board)
+    if index in seen:
+        return
+    seen[index] = board
+    if not ttt.terminal(board):
+        for action in ttt.actions(board):
+            reachable(ttt.result(board, action), seen)
+
+
+def build(path=ttt.BOOK_PATH):
+    """Solves every reachable position and writes the book to `path`."""
+    seen = {}
+    reachable(ttt.initial_state(), seen)
+    book = bytearray([ttt.NOT_IN_BOOK]) * 3 ** 9
+    for index, board in seen.items():
+        value, action = ttt.recursion(board)
+        square = ttt.NO_MOVE if action is None else 3 * action[0] + action[1]
+        book[index] = (value + 1) << 4 | square
+    with open(path, "wb") as f:
+        f.write(book)
+    return len(seen)
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else ttt.BOOK_PATH
+    print(f"Solved {build(path)} positions into {path}.")
@@ -0,0 +1,225 @@
+"""
+Monte Carlo Tree Search Tic Tac Toe Player
+
+UCT search for boards where even iterative deepening is too slow. Works
+on any game set up with mnk.configure (3x3 by default). Playouts run on
+a flat list of squares and only check the lines through each new move.
+With several workers, independent trees are grown in a process pool and
+their root visit counts are summed (root parallelism).
+"""
+
+import math
+import random
+import time
+from contextlib import nullcontext
+from multiprocessing import Pool
+
+import mnk
+from profiling import SearchStats
+
+X = mnk.X
+O = mnk.O
+EMPTY = mnk.EMPTY
+
+# Default budget when neither playouts nor seconds are given
+PLAYOUTS = 5000
+
+# Exploration constant in the UCT formula
+EXPLORATION = math.sqrt(2)
+
+# Settings used by minimax(board)
+SECONDS = None
+WORKERS = 1
+
+# Counters for profiling (a profiling.SearchStats), or None when off
+stats = None
+
+DRAW = "draw"
+
+
+class Node():
+    def __init__(self, parent, move, mover, untried, outcome=None):
+        """
+        `move` is the square `mover` played to reach this node, `untried`
+        the squares not yet expanded, and `outcome` the winning mark (or
+        DRAW) if the game is over here.
+        """
+        self.parent = parent
+        self.move = move
+        self.mover = mover
+        self.untried = untried
+        self.outcome = outcome
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+
+    def select(self):
+        """Returns the child with the highest UCT score."""
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: (
+            child.wins / child.visits
+            + EXPLORATION * math.sqrt(log_visits / child.visits)
+        ))
+
+
+class Searcher():
+
+    def __init__(self, rows, cols, k, seed=None):
+        self.rows = rows
+        self.cols = cols
+        self.random = random.Random(seed)
+
+        # Lines of k squares through each square, as flat indexes
+        game = mnk.MNKGame(rows, cols, k)
+        self.lines_through = [[] for _ in range(rows * cols)]
+        for line in game.lines:
+            flat = tuple(i * cols + j for i, j in line)
+            for square in flat:
+                self.lines_through[square].append(flat)
+
+    def wins(self, cells, square):
+        """Returns True if the mark just placed on square completes a line."""
+        mark = cells[square]
+        return any(
+            all(cells[s] == mark for s in line)
+            for line in self.lines_through[square]
+        )
+
+    def playout(self, cells, to_move):
+        """Plays uniformly random moves to the end; returns the outcome."""
+        empty = [square for square, mark in enumerate(cells) if mark is EMPTY]
+        self.random.shuffle(empty)
+        for square in empty:
+            cells[square] = to_move
+            if self.wins(cells, square):
+                return to_move
+            to_move = O if to_move == X else X
+        return DRAW
+
+    def search(self, board, playouts=None, seconds=None, stats=None):
+        """
+        Grows a UCT tree from the board for `playouts` playouts or
+        `seconds` seconds, but always at least one playout, so there is
+        a move to return. Returns the visit count of each root move.
+
+        If `stats` is given, counts the tree nodes passed through, one
+        terminal evaluation per playout, and the deepest tree node.
+        """
+        if playouts is None and seconds is None:
+            playouts = PLAYOUTS
+        deadline = None if seconds is None else time.perf_counter() + seconds
+        start = [mark for row in board for mark in row]
+        to_move = X if start.count(X) == start.count(O) else O
+        root = Node(None, None, O if to_move == X else X,
+                    [square for square, mark in enumerate(start) if mark is EMPTY])
+
+        count = 0
+        while count == 0 or (
+                (playouts is None or count < playouts)
+                and (deadline is None or time.perf_counter() < deadline)):
+            count += 1
+            node = root
+            cells = start[:]
+            depth = 0
+
+            # Selection
+            while not node.untried and node.children:
+                node = node.select()
+                cells[node.move] = node.mover
+                depth += 1
+
+            # Expansion
+            if node.untried and node.outcome is None:
+                i = self.random.randrange(len(node.untried))
+                node.untried[i], node.untried[-1] = node.untried[-1], node.untried[i]
+                move = node.untried.pop()
+                mover = O if node.mover == X else X
+                cells[move] = mover
+                empty = [square for square, mark in enumerate(cells) if mark is EMPTY]
+                if self.wins(cells, move):
+                    child = Node(node, move, mover, [], mover)
+                elif not empty:
+                    child = Node(node, move, mover, [], DRAW)
+                else:
+                    child = Node(node, move, mover, empty)
+                node.children.append(child)
+                node = child
+                depth += 1
+
+            if stats is not None:
+                stats.nodes += depth
+                stats.terminals += 1
+                stats.max_depth = max(stats.max_depth, depth)
+
+            # Simulation
+            outcome = node.outcome
+            if outcome is None:
+                outcome = self.playout(cells, O if node.mover == X else X)
+
+            # Backpropagation, scoring each node for the player who moved into it
+            while node is not None:
+                node.visits += 1
+                if outcome == DRAW:
+                    node.wins += 0.5
+                elif outcome == node.mover:
+                    node.wins += 1
+                node = node.parent
+
+        return {
+            divmod(child.move, self.cols): child.visits for child in root.children
+        }
+
+
+def run_tree(task):
+    """
+    Pool task: grows one tree and returns its root visit counts, with its
+    SearchStats if `profile` is set (else None).
+    """
+    rows, cols, k, board, playouts, seconds, seed, profile = task
+    tree_stats = SearchStats() if profile else None
+    visits = Searcher(rows, cols, k, seed).search(board, playouts, seconds, tree_stats)
+    return (visits, tree_stats)
+
+
+def search(board, game=None, playouts=None, seconds=None, workers=1, seed=None):
+    """
+    Returns (action, visits) for the current player on the board, where
+    visits maps each root move to the playouts through it, summed over
+    `workers` independent trees. Playouts are split between workers;
+    a time budget applies to each. Counted into `stats` if it is set.
+    """
+    game = game or mnk.game
+    if game.terminal(board):
+        return (None, {})
+    with stats.call() if stats is not None else nullcontext():
+        if workers <= 1:
+            visits = Searcher(game.rows, game.cols, game.k, seed).search(
+                board, playouts, seconds, stats
+            )
+        else:
+            if playouts is None and seconds is None:
+                playouts = PLAYOUTS
+            share = None if playouts is None else math.ceil(playouts / workers)
+            base = random.Random(seed).getrandbits(32)
+            tasks = [
+                (game.rows, game.cols, game.k, board, share, seconds, base + i,
+                 stats is not None)
+                for i in range(workers)
+            ]
+            visits = {}
+            with Pool(workers) as pool:
+                for tree, tree_stats in pool.map(run_tree, tasks):
+                    for move, count in tree.items():
+                        visits[move] = visits.get(move, 0) + count
+                    if tree_stats is not None:
+                        stats.merge(tree_stats)
+    return (max(visits, key=visits.get), visits)
+
+
+def minimax(board):
+    """
+    Returns the best action found for the current player on the board,
+    by MCTS with the module's PLAYOUTS/SECONDS/WORKERS settings.
+    """
+    playouts = None if SECONDS is not None else PLAYOUTS
+    return search(board, playouts=playouts, seconds=SECONDS, workers=WORKERS)[0]
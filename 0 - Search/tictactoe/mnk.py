@@ -0,0 +1,283 @@
+"""
+Generalized m,n,k Tic Tac Toe Player
+
+Plays k-in-a-row on an m x n board (e.g. 4x4 or 5x5), where exhaustive
+minimax is intractable. minimax runs iterative-deepening alpha-beta
+search within a wall-clock time budget, scoring the positions at the
+search horizon with a pluggable heuristic.
+
+The module-level functions follow tictactoe.py's interface for the game
+set up by `configure` (3x3, 3 in a row by default).
+"""
+
+import math
+import time
+from contextlib import nullcontext
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Scores of won positions; faster wins score higher
+WIN = 10 ** 9
+
+# Default time budget for one move, in seconds
+SECONDS = 1.0
+
+# Counters for profiling (a profiling.SearchStats), or None when off
+stats = None
+
+
+class Timeout(Exception):
+    pass
+
+
+def line_heuristic(game, board):
+    """
+    Scores a board for X: every line of k squares still open to only one
+    player counts 10 ** (pieces that player has in it), for X or against.
+    """
+    score = 0
+    for line in game.lines:
+        xs = os = 0
+        for i, j in line:
+            if board[i][j] == X:
+                xs += 1
+            elif board[i][j] == O:
+                os += 1
+        if xs and not os:
+            score += 10 ** xs
+        elif os and not xs:
+            score -= 10 ** os
+    return score
+
+
+class MNKGame():
+
+    def __init__(self, rows=3, cols=3, k=3, heuristic=line_heuristic):
+        """
+        Set up a game of `k` in a row on a `rows` x `cols` board.
+        `heuristic(game, board)` scores non-terminal boards for X.
+        """
+        if k > max(rows, cols):
+            raise ValueError("k cannot exceed the board size")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.heuristic = heuristic
+
+        # Every run of k squares in a row, column or diagonal
+        self.lines = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.lines.append(
+                            [(i + di * step, j + dj * step) for step in range(k)]
+                        )
+
+        # Squares nearest the center first, which tend to be the best moves
+        center = ((rows - 1) / 2, (cols - 1) / 2)
+        self.order = sorted(
+            ((i, j) for i in range(rows) for j in range(cols)),
+            key=lambda square: math.dist(square, center)
+        )
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.cols for _ in range(self.rows)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        xs = sum(row.count(X) for row in board)
+        os = sum(row.count(O) for row in board)
+        return X if xs == os else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {
+            (i, j) for i in range(self.rows) for j in range(self.cols)
+            if board[i][j] is EMPTY
+        }
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.rows and 0 <= j < self.cols) or board[i][j] is not EMPTY:
+            raise Exception("Not a valid move!")
+        return self.place(board, action, self.player(board))
+
+    def place(self, board, action, mark):
+        """Returns a copy of the board with `mark` at action (i, j)."""
+        i, j = action
+        new_board = [row[:] for row in board]
+        new_board[i][j] = mark
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        for line in self.lines:
+            i, j = line[0]
+            mark = board[i][j]
+            if mark is not EMPTY and all(board[i][j] == mark for i, j in line):
+                return mark
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (self.winner(board) is not None
+                or all(square is not EMPTY for row in board for square in row))
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        return {X: 1, O: -1, None: 0}[self.winner(board)]
+
+    def minimax(self, board, seconds=SECONDS, max_depth=None):
+        """
+        Returns the best action found for the current player on the board
+        within `seconds`, by iterative-deepening alpha-beta search.
+        Counted into the module's `stats` if it is set.
+        """
+        with stats.call() if stats is not None else nullcontext():
+            return self.search(board, seconds, max_depth)[1]
+
+    def search(self, board, seconds=SECONDS, max_depth=None):
+        """
+        Searches one ply deeper at a time until the time budget runs out,
+        the result is a proven win or loss, or `max_depth` is reached.
+
+        Returns (value for the player to move, action, deepest completed
+        depth); the action comes from the deepest completed search.
+        """
+        if self.terminal(board):
+            return (0, None, 0)
+        deadline = time.perf_counter() + seconds
+        color = 1 if self.player(board) == X else -1
+        remaining = sum(row.count(EMPTY) for row in board)
+        if max_depth is None:
+            max_depth = remaining
+
+        # Best move per position from earlier iterations, tried first
+        self.best_moves = {}
+        value, action, completed = 0, None, 0
+        for depth in range(1, min(max_depth, remaining) + 1):
+            try:
+                value, action = self.root(board, depth, color, deadline)
+            except Timeout:
+                break
+            completed = depth
+            if abs(value) >= WIN - remaining:
+                break
+        if action is None:
+            action = next(square for square in self.order
+                          if board[square[0]][square[1]] is EMPTY)
+        return (value, action, completed)
+
+    def root(self, board, depth, color, deadline):
+        """Returns (value, action) of a depth-limited search from the root."""
+        value = self.negamax(board, depth, -math.inf, math.inf, color, deadline, 0)
+        return (value, self.best_moves[self.key(board)])
+
+    def key(self, board):
+        return tuple(tuple(row) for row in board)
+
+    def negamax(self, board, depth, alpha, beta, color, deadline, ply):
+        """
+        Alpha-beta search in negamax form: returns the value of the board
+        for the player to move (color 1 for X, -1 for O).
+        """
+        if time.perf_counter() > deadline:
+            raise Timeout
+        winner = self.winner(board)
+        moves = [square for square in self.order if board[square[0]][square[1]] is EMPTY]
+        if stats is not None:
+            stats.node(ply, terminal=winner is not None or not moves or depth == 0)
+        if winner is not None:
+            # The previous mover won, so the player to move has lost
+            return -(WIN - ply)
+        if not moves:
+            return 0
+        if depth == 0:
+            return color * self.heuristic(self, board)
+
+        key = self.key(board)
+        best = self.best_moves.get(key)
+        if best is not None:
+            moves.remove(best)
+            moves.insert(0, best)
+
+        mark = X if color == 1 else O
+        value = -math.inf
+        for move in moves:
+            child = self.place(board, move, mark)
+            new_value = -self.negamax(child, depth - 1, -beta, -alpha, -color,
+                                      deadline, ply + 1)
+            if new_value > value:
+                value, best = new_value, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                break
+        self.best_moves[key] = best
+        return value
+
+
+game = MNKGame()
+
+
+def configure(rows=3, cols=3, k=3, heuristic=line_heuristic):
+    """
+    Sets the game played by the module-level functions.
+    """
+    global game
+    game = MNKGame(rows, cols, k, heuristic)
+    return game
+
+
+def initial_state():
+    return game.initial_state()
+
+
+def player(board):
+    return game.player(board)
+
+
+def actions(board):
+    return game.actions(board)
+
+
+def result(board, action):
+    return game.result(board, action)
+
+
+def winner(board):
+    return game.winner(board)
+
+
+def terminal(board):
+    return game.terminal(board)
+
+
+def utility(board):
+    return game.utility(board)
+
+
+def minimax(board):
+    return game.minimax(board, SECONDS)
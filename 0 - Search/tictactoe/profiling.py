@@ -0,0 +1,79 @@
+"""
+Opt-in search counters for the tic-tac-toe engines.
+
+Each engine module (tictactoe, bitboard, mnk, mcts) has a `stats`
+global, None by default. Set it to a SearchStats to have every call to
+the engine's minimax counted into it:
+
+    stats = profiling.SearchStats()
+    mnk.stats = stats
+    mnk.minimax(board)
+    print(stats)
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class SearchStats():
+    def __init__(self):
+        """
+        Counts, over every call recorded: positions searched, leaves
+        scored (finished games, or the heuristic at a search horizon, or
+        the end of a playout), answers taken from a table or book, alpha-
+        beta cutoffs, the deepest ply reached, and the time of each call.
+        """
+        self.nodes = 0
+        self.terminals = 0
+        self.cache_hits = 0
+        self.cutoffs = 0
+        self.max_depth = 0
+        self.times = []
+        self.origin = 0
+
+    @contextmanager
+    def call(self, origin=0):
+        """
+        Times one engine call. Depths passed to `node` are measured from
+        `origin` (e.g. the number of pieces on the root board).
+        """
+        self.origin = origin
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.times.append(time.perf_counter() - started)
+
+    def node(self, depth, terminal=False):
+        """Records a position searched at `depth`."""
+        self.nodes += 1
+        if terminal:
+            self.terminals += 1
+        self.max_depth = max(self.max_depth, depth - self.origin)
+
+    def merge(self, other):
+        """Adds the counts of another SearchStats, e.g. from a worker."""
+        self.nodes += other.nodes
+        self.terminals += other.terminals
+        self.cache_hits += other.cache_hits
+        self.cutoffs += other.cutoffs
+        self.max_depth = max(self.max_depth, other.max_depth)
+
+    def as_dict(self):
+        return {
+            "calls": len(self.times),
+            "nodes": self.nodes,
+            "terminals": self.terminals,
+            "cache_hits": self.cache_hits,
+            "cutoffs": self.cutoffs,
+            "max_depth": self.max_depth,
+            "seconds": sum(self.times),
+            "mean_seconds": sum(self.times) / len(self.times) if self.times else 0.0,
+            "last_seconds": self.times[-1] if self.times else 0.0,
+        }
+
+    def __str__(self):
+        return " ".join(
+            f"{key}={value:.6f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in self.as_dict().items()
+        )
@@ -1,7 +1,10 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import Future
 
+import profiling
 import tictactoe as ttt
 
 pygame.init()
@@ -17,9 +20,47 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+clock = pygame.time.Clock()
+FPS = 60
+
+# With --profile, print the engine's search counters after each AI move
+PROFILE = "--profile" in sys.argv
+
+# Seconds a search runs before Play Again is offered to abandon it
+PATIENCE = 1.0
+
+# Searches run one at a time: an abandoned search finishes before the next
+# starts, so they never share the engine's tables or stats at once
+search_lock = threading.Lock()
+
+
+def think(board):
+    """
+    Starts searching for the AI's move on a daemon thread, so the window
+    keeps redrawing, and returns a Future for (move, search stats or
+    None). Cancelling the Future abandons the search: it is skipped if
+    still waiting for an earlier one, and its result is never applied.
+    """
+    future = Future()
+
+    def run():
+        with search_lock:
+            if not future.set_running_or_notify_cancel():
+                return
+            ttt.stats = profiling.SearchStats() if PROFILE else None
+            try:
+                future.set_result((ttt.minimax(board), ttt.stats))
+            except Exception as e:
+                future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
+ai_move = None
+ai_started = None
 
 while True:
 
@@ -110,13 +151,15 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
+            if ai_move is None:
+                ai_move = think(board)
+                ai_started = time.perf_counter()
+            elif ai_move.done():
+                move, stats = ai_move.result()
                 board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+                ai_move = None
+                if stats is not None:
+                    print(stats, file=sys.stderr)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -127,7 +170,9 @@ while True:
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
+        # Offer a new game once this one is over, or if the AI is slow
+        if game_over or (ai_move is not None
+                         and time.perf_counter() - ai_started > PATIENCE):
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
             again = mediumFont.render("Play Again", True, black)
             againRect = again.get_rect()
@@ -141,6 +186,9 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    if ai_move is not None:
+                        ai_move.cancel()
+                        ai_move = None
 
     pygame.display.flip()
+    clock.tick(FPS)
@@ -4,12 +4,61 @@ Tic Tac Toe Player
 
 import math
 import copy
+import os
+from contextlib import nullcontext
 import numpy as np
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# The 8 rotations and reflections of the board, as maps of (i, j)
+SYMMETRIES = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+]
+
+# INVERSES[k] is the index of the symmetry that undoes SYMMETRIES[k]
+INVERSES = [
+    next(m for m, inverse in enumerate(SYMMETRIES)
+         if all(inverse(*symmetry(i, j)) == (i, j)
+                for i in range(3) for j in range(3)))
+    for symmetry in SYMMETRIES
+]
+
+# Maps canonical boards to (value, best action in the canonical orientation),
+# shared by every call to minimax in this process
+transpositions = {}
+
+# Most entries kept in the transposition table (None for no limit)
+TABLE_LIMIT = None
+
+# Maps canonical boards to the best action found by a cut-off alpha-beta
+# search, in the canonical orientation; tried first when revisited
+hints = {}
+
+# Squares in the order alpha-beta tries them: center, corners, edges
+ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Positions searched (not answered from the transposition table)
+nodes = 0
+
+# Counters for profiling (a profiling.SearchStats), or None when off
+stats = None
+
+# Opening book written by book.py: one byte per board, indexed by book_index,
+# holding (value + 1) << 4 | (3 * i + j) for the best action (i, j)
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+NO_MOVE = 0x0F
+NOT_IN_BOOK = 0xFF
+book = None
+
 def initial_state():
     """
     Returns starting state of the board.
@@ -57,18 +106,18 @@ def result(board, action):
 
 def check_rows(board):
     for row in board:
-        if len(set(row)) == 1:
+        if len(set(row)) == 1 and row[0] is not EMPTY:
             return row[0]
     
 def check_cols(board):
     for row in np.transpose(board):
-        if len(set(row)) == 1:
+        if len(set(row)) == 1 and row[0] is not EMPTY:
             return row[0]
     
 def check_diags(board):
-    if len(set([board[i][i] for i in range(3)])) == 1:
+    if len(set([board[i][i] for i in range(3)])) == 1 and board[1][1] is not EMPTY:
         return board[0][0]
-    if len(set([board[i][2 - i] for i in range(3)])) == 1:
+    if len(set([board[i][2 - i] for i in range(3)])) == 1 and board[1][1] is not EMPTY:
         return board[0][2]
 
 def winner(board):
@@ -99,9 +148,75 @@ def utility(board):
 
 
 
+def canonical(board):
+    """
+    Returns the canonical form of the board over its 8 symmetries, and
+    the index of the symmetry that maps the board onto it.
+    """
+    best = None
+    for k, symmetry in enumerate(SYMMETRIES):
+        cells = [""] * 9
+        for i in range(3):
+            for j in range(3):
+                ti, tj = symmetry(i, j)
+                cells[3 * ti + tj] = board[i][j] or ""
+        key = tuple(cells)
+        if best is None or key < best[0]:
+            best = (key, k)
+    return best
+
+
 def recursion(board):
+    """
+    Returns (value, action) for the board, through the transposition table.
+    """
+    key, k = canonical(board)
+    if key in transpositions:
+        if stats is not None:
+            stats.cache_hits += 1
+        return lookup(key, k)
+    value, action = solve(board)
+    store(key, k, value, action)
+    return (value, action)
+
+
+def lookup(key, k):
+    """
+    Returns the (value, action) stored for a canonical key, with the action
+    mapped back through the inverse of symmetry k.
+    """
+    value, action = transpositions[key]
+    if action is not None:
+        action = SYMMETRIES[INVERSES[k]](*action)
+    return (value, action)
+
+
+def store(key, k, value, action):
+    """
+    Stores an exact (value, action) for a board whose canonical key was
+    reached through symmetry k, keeping within TABLE_LIMIT.
+    """
+    if TABLE_LIMIT is None or TABLE_LIMIT > 0:
+        if TABLE_LIMIT is not None and len(transpositions) >= TABLE_LIMIT:
+            # Evict the oldest entry
+            del transpositions[next(iter(transpositions))]
+        transpositions[key] = (
+            value, None if action is None else SYMMETRIES[k](*action)
+        )
+
+
+def solve(board):
+    """
+    Returns (value, action) for the board by searching its children.
+    """
+    global nodes
+    nodes += 1
     if terminal(board):
+        if stats is not None:
+            stats.node(pieces(board), terminal=True)
         return (utility(board), None)
+    if stats is not None:
+        stats.node(pieces(board))
     if player(board) == "X":
         value = -2
         best_action = None
@@ -123,8 +238,136 @@ def recursion(board):
     
 
 
-def minimax(board):
+def alphabeta(board, alpha=-2, beta=2):
+    """
+    Returns (value, action) for the board by alpha-beta search, trying
+    any remembered best move first, then center, corners and edges.
+
+    The value is exact if it lies strictly between alpha and beta;
+    otherwise it is only a bound, and is not stored in the table.
+    """
+    global nodes
+    key, k = canonical(board)
+    if key in transpositions:
+        if stats is not None:
+            stats.cache_hits += 1
+        return lookup(key, k)
+    nodes += 1
+    if stats is not None:
+        stats.node(pieces(board), terminal=terminal(board))
+    if terminal(board):
+        value = utility(board)
+        store(key, k, value, None)
+        return (value, None)
+
+    available = actions(board)
+    ordered = [action for action in ORDER if action in available]
+    if key in hints:
+        hint = SYMMETRIES[INVERSES[k]](*hints[key])
+        ordered.remove(hint)
+        ordered.insert(0, hint)
+
+    maximizing = player(board) == X
+    value = -2 if maximizing else 2
+    best_action = None
+    lower, upper = alpha, beta
+    for action in ordered:
+        new_value = alphabeta(result(board, action), lower, upper)[0]
+        if maximizing and new_value > value:
+            value, best_action = new_value, action
+            lower = max(lower, value)
+        elif not maximizing and new_value < value:
+            value, best_action = new_value, action
+            upper = min(upper, value)
+        if lower >= upper:
+            if stats is not None:
+                stats.cutoffs += 1
+            break
+
+    hints[key] = SYMMETRIES[k](*best_action)
+    if alpha < value < beta:
+        store(key, k, value, best_action)
+    return (value, best_action)
+
+
+def pieces(board):
+    """Returns the number of marks on the board."""
+    return sum(square is not EMPTY for row in board for square in row)
+
+
+def count_nodes(board, pruning=False, table=False):
+    """
+    Returns how many positions minimax searches from the board, with or
+    without alpha-beta pruning and the transposition table, starting from
+    empty tables and without the opening book. The shared tables are left
+    as they were.
+    """
+    global transpositions, hints, TABLE_LIMIT, nodes
+    saved = transpositions, hints, TABLE_LIMIT
+    transpositions, hints, nodes = {}, {}, 0
+    if not table:
+        TABLE_LIMIT = 0
+    try:
+        minimax(board, pruning, use_book=False)
+        return nodes
+    finally:
+        transpositions, hints, TABLE_LIMIT = saved
+
+
+def book_index(board):
+    """
+    Returns the board read as a base-3 number, with EMPTY as 0, X as 1
+    and O as 2, from square (0, 0) as the most significant digit.
+    """
+    index = 0
+    for row in board:
+        for square in row:
+            index = 3 * index + (0 if square is EMPTY else 1 if square == X else 2)
+    return index
+
+
+def load_book():
+    """
+    Returns the opening book's bytes, reading the file on first use
+    (empty if there is no book file).
+    """
+    global book
+    if book is None:
+        try:
+            with open(BOOK_PATH, "rb") as f:
+                book = f.read()
+        except FileNotFoundError:
+            book = b""
+    return book
+
+
+def book_entry(board):
+    """
+    Returns (value, action) for the board from the opening book, or None
+    if there is no book file or the board is not in it.
+    """
+    book = load_book()
+    index = book_index(board)
+    if index >= len(book) or book[index] == NOT_IN_BOOK:
+        return None
+    entry = book[index]
+    square = entry & 0x0F
+    return ((entry >> 4) - 1, None if square == NO_MOVE else divmod(square, 3))
+
+
+def minimax(board, pruning=False, use_book=True):
     """
-    Returns the optimal action for the current player on the board.
+    Returns the optimal action for the current player on the board,
+    from the opening book if available and `use_book` is set, else by
+    search (alpha-beta if `pruning` is set). Counted into `stats` if it
+    is set.
     """
-    return recursion(board)[1]        
\ No newline at end of file
+    with stats.call(pieces(board)) if stats is not None else nullcontext():
+        entry = book_entry(board) if use_book else None
+        if entry is not None:
+            if stats is not None:
+                stats.cache_hits += 1
+            return entry[1]
+        if pruning:
+            return alphabeta(board)[1]
+        return recursion(board)[1]        
\ No newline at end of file
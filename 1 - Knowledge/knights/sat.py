@@ -0,0 +1,195 @@
+"""
+SAT backend for model checking.
+
+Converts sentences to CNF with the Tseitin transformation and decides
+satisfiability with DPLL, so knowledge bases with hundreds of symbols
+can be checked without enumerating all 2^n models. A drop-in for
+logic.model_check:
+
+    from sat import model_check
+"""
+
+from collections import Counter
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    def __init__(self):
+        """
+        Clauses are frozensets of literals: a positive or negative int
+        per variable. Symbols get the first variable numbers they need;
+        Tseitin adds one variable per distinct compound subsentence.
+        """
+        self.clauses = []
+        self.variables = {}
+        self.definitions = {}
+        self.count = 0
+
+    def variable(self):
+        """Returns a new variable."""
+        self.count += 1
+        return self.count
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to the sentence, adding the clauses
+        that define it.
+        """
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.variables:
+                self.variables[sentence.name] = self.variable()
+            return self.variables[sentence.name]
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.definitions:
+            return self.definitions[sentence]
+
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            v = self.define(sentence)
+            # v <=> p1 ∧ ... ∧ pn
+            for p in parts:
+                self.add(-v, p)
+            self.add(v, *(-p for p in parts))
+        elif isinstance(sentence, Or):
+            parts = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            v = self.define(sentence)
+            # v <=> p1 ∨ ... ∨ pn
+            for p in parts:
+                self.add(v, -p)
+            self.add(-v, *parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            v = self.define(sentence)
+            # v <=> ¬a ∨ b
+            self.add(-v, -a, b)
+            self.add(v, a)
+            self.add(v, -b)
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            v = self.define(sentence)
+            # v <=> (a <=> b)
+            self.add(-v, -a, b)
+            self.add(-v, a, -b)
+            self.add(v, a, b)
+            self.add(v, -a, -b)
+        else:
+            raise TypeError(f"cannot convert {type(sentence).__name__} to CNF")
+        return v
+
+    def define(self, sentence):
+        """Returns a new variable standing for a compound sentence."""
+        var = self.variable()
+        self.definitions[sentence] = var
+        return var
+
+    def add(self, *literals):
+        """Adds a clause, skipping tautologies."""
+        clause = frozenset(literals)
+        if not any(-literal in clause for literal in clause):
+            self.clauses.append(clause)
+
+    def assert_sentence(self, sentence, value=True):
+        """Adds clauses requiring the sentence to have `value`."""
+        literal = self.literal(sentence)
+        self.add(literal if value else -literal)
+
+
+def assign(clauses, literal):
+    """
+    Returns the clauses simplified by making `literal` true, or None if
+    that falsifies one of them.
+    """
+    simplified = []
+    for clause in clauses:
+        if literal in clause:
+            continue
+        if -literal in clause:
+            clause = clause - {-literal}
+            if not clause:
+                return None
+        simplified.append(clause)
+    return simplified
+
+
+def simplify(clauses, assignment):
+    """
+    Applies unit propagation and pure-literal elimination until neither
+    applies. Returns the remaining clauses (None on a conflict), adding
+    the literals it sets to `assignment`.
+    """
+    while clauses:
+        units = {next(iter(clause)) for clause in clauses if len(clause) == 1}
+        if units:
+            if any(-unit in units for unit in units):
+                return None
+            chosen = units
+        else:
+            counts = Counter(literal for clause in clauses for literal in clause)
+            chosen = {literal for literal in counts if -literal not in counts}
+            if not chosen:
+                return clauses
+        for literal in chosen:
+            assignment[abs(literal)] = literal > 0
+            clauses = assign(clauses, literal)
+            if clauses is None:
+                return None
+    return clauses
+
+
+def dpll(clauses):
+    """
+    Returns a satisfying assignment {variable: bool} for the clauses
+    (variables left out may take either value), or None if there is none.
+    """
+    frontier = [(list(clauses), {}, None)]
+    while frontier:
+        clauses, assignment, literal = frontier.pop()
+        assignment = dict(assignment)
+        if literal is not None:
+            assignment[abs(literal)] = literal > 0
+            clauses = assign(clauses, literal)
+            if clauses is None:
+                continue
+        clauses = simplify(clauses, assignment)
+        if clauses is None:
+            continue
+        if not clauses:
+            return assignment
+
+        # Branch on the most frequent literal in the shortest clauses
+        shortest = min(len(clause) for clause in clauses)
+        counts = Counter(
+            literal for clause in clauses if len(clause) == shortest
+            for literal in clause
+        )
+        literal = counts.most_common(1)[0][0]
+        frontier.append((clauses, assignment, -literal))
+        frontier.append((clauses, assignment, literal))
+    return None
+
+
+def satisfiable(sentence):
+    """
+    Returns a model {symbol name: bool} in which the sentence is true,
+    or None if it is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.assert_sentence(sentence)
+    assignment = dpll(cnf.clauses)
+    if assignment is None:
+        return None
+    return {
+        name: assignment.get(var, False) for name, var in cnf.variables.items()
+    }
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query, as KB ∧ ¬query being unsatisfiable."""
+    cnf = CNF()
+    cnf.assert_sentence(knowledge)
+    cnf.assert_sentence(query, False)
+    return dpll(cnf.clauses) is None